@@ -392,14 +392,15 @@ class DueDiligenceExpress:
         
         # Financial Metrics Comparison Chart
         metrics_comparison = go.Figure()
+        benchmarks = sector_analysis.get("benchmarks")
         for metric_name, metric in financial_metrics["metrics"].items():
-            if metric_name in sector_analysis.get("benchmarks", {}):
-                benchmark = sector_analysis["benchmarks"][metric_name]
+            if benchmarks is not None and metric_name in benchmarks.index:
+                sector_average = benchmarks.at[metric_name, "sector_average"]
                 metrics_comparison.add_trace(go.Bar(
                     name=metric_name,
                     x=["Company", "Sector Average"],
-                    y=[metric.value, benchmark["sector_average"]],
-                    text=[f"{metric.value:.1%}", f"{benchmark['sector_average']:.1%}"],
+                    y=[metric.value, sector_average],
+                    text=[f"{metric.value:.1%}", f"{sector_average:.1%}"],
                     textposition="auto"
                 ))
         
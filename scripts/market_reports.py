@@ -1,8 +1,10 @@
 from typing import Dict, List, Optional, Set, Any, Union
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pandas as pd
+import connectorx as cx
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
@@ -13,7 +15,11 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
 import schedule
 import threading
+from concurrent.futures import ThreadPoolExecutor
+import time
 import json
+from collections import Counter
+import re
 from pathlib import Path
 import logging
 from enum import Enum
@@ -21,12 +27,14 @@ import pytz
 import seaborn as sns
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from statsmodels.tsa.seasonal import seasonal_decompose
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.pipeline import Pipeline
+from sklearn.metrics import silhouette_score
+from statsmodels.tsa.seasonal import DecomposeResult
 from statsmodels.tsa.stattools import adfuller
 from prophet import Prophet
 import networkx as nx
-from textblob import TextBlob
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from wordcloud import WordCloud
 import pycountry
 import folium
@@ -116,9 +124,14 @@ class NewsletterConfig:
     personalization: bool
 
 class MarketReportingSystem:
+    _IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+    _TRENDS_CACHE_TTL = 3600  # seconds
+
     def __init__(self, db_connection: Any = None, email_config: Dict = None):
         self.db = db_connection
         self.email_config = email_config or self._default_email_config()
+        self._trends_cache: Dict[str, tuple] = {}
+        self._trends_cache_lock = threading.Lock()
         self.setup_logging()
         self.load_templates()
         self.setup_scheduler()
@@ -138,9 +151,14 @@ class MarketReportingSystem:
         template_dir = Path("templates")
         self.env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(template_dir),
-            autoescape=jinja2.select_autoescape(['html', 'xml'])
+            autoescape=jinja2.select_autoescape(['html', 'xml']),
+            bytecode_cache=jinja2.FileSystemBytecodeCache(),
+            auto_reload=False
         )
         
+        # Compiled on first render, then reused
+        self._newsletter_template = None
+        
     def setup_scheduler(self):
         """Setup scheduled tasks"""
         schedule.every().monday.at("09:00").do(self.generate_weekly_newsletter)
@@ -153,6 +171,8 @@ class MarketReportingSystem:
     def generate_dynamic_report(self, config: ReportConfig) -> Dict[str, Any]:
         """Generate a dynamic report based on user configuration"""
         try:
+            generated_at = datetime.now(timezone.utc)
+            
             # Fetch data
             data = self._fetch_report_data(config)
             
@@ -168,7 +188,7 @@ class MarketReportingSystem:
             # Compile report
             report = {
                 "title": f"{config.report_type.value.title()} Report",
-                "timestamp": datetime.now(),
+                "timestamp": generated_at,
                 "config": config,
                 "data": processed_data,
                 "charts": charts,
@@ -184,6 +204,8 @@ class MarketReportingSystem:
     def generate_weekly_newsletter(self):
         """Generate and send weekly newsletter"""
         try:
+            generated_at = datetime.now(timezone.utc)
+            
             # Get market trends
             trends = self._analyze_market_trends()
             
@@ -194,7 +216,7 @@ class MarketReportingSystem:
             insights = self._generate_industry_insights()
             
             # Generate newsletter content
-            content = self._generate_newsletter_content(trends, deals, insights)
+            content = self._generate_newsletter_content(trends, deals, insights, generated_at)
             
             # Send newsletter
             self._send_newsletter(content)
@@ -262,28 +284,67 @@ class MarketReportingSystem:
             raise
 
     def _fetch_report_data(self, config: ReportConfig) -> pd.DataFrame:
-        """Fetch data for report"""
-        # Implement data fetching logic
-        return pd.DataFrame()
+        """Fetch data for report, as column-oriented Arrow buffers when given a connection URI"""
+        if self.db is None:
+            return pd.DataFrame()
+        
+        query = self._build_report_query(config)
+        if isinstance(self.db, str):
+            # connectorx pulls columns in parallel straight into Arrow arrays,
+            # which pandas then adopts without a row-to-column transpose
+            table = cx.read_sql(self.db, query, return_type="arrow")
+            data = table.to_pandas(self_destruct=True, split_blocks=True, strings_to_categorical=True)
+            data = data.set_index("timestamp")
+        else:
+            # DBAPI connections and SQLAlchemy engines go through pandas
+            data = pd.read_sql(query, self.db, index_col="timestamp", parse_dates=["timestamp"])
+        return self._categorize_filter_columns(data, config)
+
+    def _build_report_query(self, config: ReportConfig) -> str:
+        """Build the SQL query selecting only the columns the report needs"""
+        table = config.custom_options.get("table")
+        if table is None:
+            raise ValueError("Report source table must be set in custom_options['table']")
+        columns = ["timestamp", *config.metrics, *config.filters]
+        for identifier in [table, *columns]:
+            if not self._IDENTIFIER_PATTERN.match(identifier):
+                raise ValueError(f"Invalid column or table name: {identifier}")
+        
+        start = config.time_range["start"].strftime("%Y-%m-%d %H:%M:%S")
+        end = config.time_range["end"].strftime("%Y-%m-%d %H:%M:%S")
+        return (
+            f"SELECT {', '.join(dict.fromkeys(columns))} FROM {table} "
+            f"WHERE timestamp BETWEEN '{start}' AND '{end}' ORDER BY timestamp"
+        )
+
+    def _categorize_filter_columns(self, data: pd.DataFrame, config: ReportConfig) -> pd.DataFrame:
+        """Convert string filter columns to categoricals so equality masks compare integer codes"""
+        for column in config.filters:
+            if column in data.columns and pd.api.types.is_string_dtype(data[column].dtype):
+                data[column] = data[column].astype("category")
+        return data
 
     def _process_report_data(self, data: pd.DataFrame, config: ReportConfig) -> pd.DataFrame:
         """Process report data"""
         try:
-            # Apply filters
-            for column, value in config.filters.items():
-                data = data[data[column] == value]
-            
-            # Apply time range
-            data = data[
-                (data.index >= config.time_range["start"]) &
-                (data.index <= config.time_range["end"])
-            ]
+            # Apply time range, using binary search when the index is sorted
+            start = pd.Timestamp(config.time_range["start"])
+            end = pd.Timestamp(config.time_range["end"])
+            index = data.index
+            masks = []
+            if index.is_monotonic_increasing:
+                data = data.iloc[index.searchsorted(start, side="left"):index.searchsorted(end, side="right")]
+            else:
+                masks.append(np.asarray((index >= start) & (index <= end)))
+            
+            # Apply filters with a single combined mask
+            masks.extend((data[column] == value).to_numpy() for column, value in config.filters.items())
+            if masks:
+                data = data.loc[np.logical_and.reduce(masks)]
             
             # Apply aggregation
             if config.aggregation:
-                data = data.resample(config.aggregation).agg({
-                    metric: "mean" for metric in config.metrics
-                })
+                data = data[config.metrics].resample(config.aggregation).mean()
             
             # Calculate comparisons if needed
             if config.comparison_mode:
@@ -368,33 +429,36 @@ class MarketReportingSystem:
 
     def _analyze_market_trends(self) -> List[Dict]:
         """Analyze market trends for newsletter"""
-        trends = []
+        sections = [
+            ("Domain Market", self._analyze_domain_market),
+            ("Industry", self._analyze_industry_trends),
+            ("Valuations", self._analyze_valuation_trends)
+        ]
         
-        # Analyze domain market trends
-        domain_trends = self._analyze_domain_market()
-        if domain_trends:
-            trends.append({
-                "category": "Domain Market",
-                "trends": domain_trends
-            })
+        # The three analyses are independent, so run them concurrently
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            results = list(executor.map(
+                lambda section: self._cached_trend_analysis(*section), sections
+            ))
         
-        # Analyze industry trends
-        industry_trends = self._analyze_industry_trends()
-        if industry_trends:
-            trends.append({
-                "category": "Industry",
-                "trends": industry_trends
-            })
+        return [
+            {"category": category, "trends": category_trends}
+            for (category, _), category_trends in zip(sections, results)
+            if category_trends
+        ]
+
+    def _cached_trend_analysis(self, key: str, analyze: Any) -> Any:
+        """Return a trend analysis result, recomputing it at most once per TTL window"""
+        now = time.monotonic()
+        with self._trends_cache_lock:
+            cached = self._trends_cache.get(key)
+        if cached and now - cached[0] < self._TRENDS_CACHE_TTL:
+            return cached[1]
         
-        # Analyze valuation trends
-        valuation_trends = self._analyze_valuation_trends()
-        if valuation_trends:
-            trends.append({
-                "category": "Valuations",
-                "trends": valuation_trends
-            })
-        
-        return trends
+        result = analyze()
+        with self._trends_cache_lock:
+            self._trends_cache[key] = (now, result)
+        return result
 
     def _get_notable_deals(self) -> List[Dict]:
         """Get notable deals for newsletter"""
@@ -406,14 +470,15 @@ class MarketReportingSystem:
         # Implement insight generation logic
         return []
 
-    def _generate_newsletter_content(self, trends: List[Dict], deals: List[Dict], insights: List[Dict]) -> Dict:
+    def _generate_newsletter_content(self, trends: List[Dict], deals: List[Dict], insights: List[Dict],
+                                     generated_at: Optional[datetime] = None) -> Dict:
         """Generate newsletter content"""
         try:
-            template = self.env.get_template("newsletter_template.html")
+            trends, images = self._render_trend_charts(trends)
             
             content = {
                 "title": "Weekly Market Update",
-                "date": datetime.now().strftime("%B %d, %Y"),
+                "date": (generated_at or datetime.now(timezone.utc)).strftime("%B %d, %Y"),
                 "trends": trends,
                 "deals": deals,
                 "insights": insights,
@@ -421,30 +486,74 @@ class MarketReportingSystem:
             }
             
             return {
-                "html": template.render(**content),
+                "html": self._get_newsletter_template().render(**content),
                 "text": self._generate_text_content(content),
-                "subject": f"Market Update - {content['date']}"
+                "subject": f"Market Update - {content['date']}",
+                "images": images
             }
         except Exception as e:
             self.logger.error(f"Error generating newsletter content: {str(e)}")
             raise
 
-    def _send_newsletter(self, content: Dict):
-        """Send newsletter to subscribers"""
+    def _get_newsletter_template(self) -> jinja2.Template:
+        """Load and compile the newsletter template on first use"""
+        if self._newsletter_template is None:
+            self._newsletter_template = self.env.get_template("newsletter_template.html")
+        return self._newsletter_template
+
+    def _render_trend_charts(self, trends: List[Dict]) -> tuple:
+        """Render trend figures to PNG once and reference them by Content-ID"""
+        figures = {}
+        rendered_trends = []
+        for category in trends:
+            category_trends = []
+            for trend in category["trends"]:
+                if isinstance(trend.get("chart"), go.Figure):
+                    cid = f"chart{len(figures)}"
+                    figures[cid] = trend["chart"]
+                    trend = {**trend, "chart": None, "chart_cid": cid}
+                category_trends.append(trend)
+            rendered_trends.append({**category, "trends": category_trends})
+        
+        if not figures:
+            return rendered_trends, {}
+        
+        # kaleido renders out of process, so the renders can overlap
+        with ThreadPoolExecutor(max_workers=min(4, len(figures))) as executor:
+            images = executor.map(
+                lambda fig: fig.to_image(format="png", width=800, height=400, engine="kaleido"),
+                figures.values()
+            )
+            return rendered_trends, dict(zip(figures, images))
+
+    def _send_newsletter(self, content: Dict, recipients: Optional[List[str]] = None):
+        """Send newsletter to subscribers over a single SMTP session"""
+        recipients = recipients or [self.email_config['to_address']]
         try:
-            msg = MIMEMultipart('alternative')
+            msg = MIMEMultipart('related')
             msg['Subject'] = content['subject']
             msg['From'] = self.email_config['from_address']
-            msg['To'] = self.email_config['to_address']
             
             # Attach text and HTML versions
-            msg.attach(MIMEText(content['text'], 'plain'))
-            msg.attach(MIMEText(content['html'], 'html'))
-            
-            # Send email
+            body = MIMEMultipart('alternative')
+            body.attach(MIMEText(content['text'], 'plain'))
+            body.attach(MIMEText(content['html'], 'html'))
+            msg.attach(body)
+            
+            # Attach pre-rendered charts referenced as cid: in the HTML
+            for cid, png in content.get('images', {}).items():
+                image = MIMEImage(png, 'png')
+                image.add_header('Content-ID', f'<{cid}>')
+                image.add_header('Content-Disposition', 'inline', filename=f'{cid}.png')
+                msg.attach(image)
+            
+            # Reuse the connection for every recipient, addressing each copy to its recipient
             with smtplib.SMTP_SSL(self.email_config['smtp_server'], self.email_config['smtp_port']) as server:
                 server.login(self.email_config['username'], self.email_config['password'])
-                server.send_message(msg)
+                for recipient in recipients:
+                    del msg['To']
+                    msg['To'] = recipient
+                    server.sendmail(msg['From'], recipient, msg.as_bytes())
         except Exception as e:
             self.logger.error(f"Error sending newsletter: {str(e)}")
             raise
@@ -461,21 +570,23 @@ class MarketReportingSystem:
         }
 
     def _run_scheduler(self):
-        """Run scheduler loop"""
+        """Run scheduler loop, sleeping until the next job is due"""
         while True:
             schedule.run_pending()
-            time.sleep(60)
+            idle_seconds = schedule.idle_seconds()
+            time.sleep(max(idle_seconds, 1) if idle_seconds is not None else 3600)
 
     def _calculate_statistics(self, data: pd.DataFrame, metrics: List[str]) -> Dict:
         """Calculate statistical measures"""
         stats = {}
         for metric in metrics:
+            values = data[metric].to_numpy(dtype=np.float64, copy=False)
             stats[metric] = {
-                "mean": data[metric].mean(),
-                "median": data[metric].median(),
-                "std": data[metric].std(),
-                "min": data[metric].min(),
-                "max": data[metric].max()
+                "mean": np.nanmean(values),
+                "median": np.nanmedian(values),
+                "std": np.nanstd(values, ddof=1),
+                "min": np.nanmin(values),
+                "max": np.nanmax(values)
             }
         return stats
 
@@ -483,10 +594,14 @@ class MarketReportingSystem:
         """Identify trends in data"""
         trends = {}
         for metric in metrics:
+            values = data[metric].to_numpy(dtype=np.float64, copy=False)
+            diffs = np.diff(values)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pct_changes = diffs / values[:-1]
             trends[metric] = {
-                "direction": "up" if data[metric].diff().mean() > 0 else "down",
-                "magnitude": abs(data[metric].pct_change().mean()),
-                "volatility": data[metric].std() / data[metric].mean()
+                "direction": "up" if np.nanmean(diffs) > 0 else "down",
+                "magnitude": abs(np.nanmean(pct_changes)),
+                "volatility": np.nanstd(values, ddof=1) / np.nanmean(values)
             }
         return trends
 
@@ -503,10 +618,13 @@ class MarketReportingSystem:
     def setup_advanced_analytics(self):
         """Setup advanced analytics components"""
         self.prophet_model = Prophet()
-        self.nlp = spacy.load("en_core_web_sm")
-        self.scaler = StandardScaler()
-        self.pca = PCA(n_components=2)
-        self.kmeans = KMeans(n_clusters=5)
+        self.nlp = spacy.load("en_core_web_sm", disable=["parser", "tagger", "lemmatizer"])
+        self.vader_analyzer = SentimentIntensityAnalyzer()
+        self.cluster_pipeline = Pipeline([
+            ("scaler", StandardScaler(copy=False)),
+            ("pca", PCA(n_components=2, svd_solver="randomized")),
+            ("kmeans", MiniBatchKMeans(n_clusters=5, batch_size=1024, n_init=3))
+        ])
         
     def setup_interactive_features(self):
         """Setup interactive visualization features"""
@@ -521,10 +639,16 @@ class MarketReportingSystem:
     def _analyze_seasonality(self, data: pd.DataFrame, metrics: List[str]) -> List[Dict]:
         """Analyze seasonality patterns"""
         insights = []
+        try:
+            # Decompose every metric in a single pass over the value matrix
+            decompositions = self._batch_seasonal_decompose(data, metrics, period=30)
+        except Exception as e:
+            self.logger.warning(f"Could not decompose seasonality: {str(e)}")
+            return insights
+            
         for metric in metrics:
             try:
-                # Perform seasonal decomposition
-                decomposition = seasonal_decompose(data[metric], period=30)
+                decomposition = decompositions[metric]
                 
                 # Extract seasonal patterns
                 seasonal_patterns = {
@@ -546,25 +670,72 @@ class MarketReportingSystem:
                 
         return insights
 
+    def _batch_seasonal_decompose(self, data: pd.DataFrame, metrics: List[str], period: int) -> Dict[str, DecomposeResult]:
+        """Additive seasonal decomposition of several metrics at once (matches statsmodels' seasonal_decompose)"""
+        values = data[metrics].to_numpy(dtype=np.float64)
+        n_obs = values.shape[0]
+        if n_obs < 2 * period:
+            raise ValueError(f"Need at least {2 * period} observations, got {n_obs}")
+        
+        if period % 2 == 0:
+            kernel = np.r_[0.5, np.ones(period - 1), 0.5] / period
+        else:
+            kernel = np.ones(period) / period
+        half = len(kernel) // 2
+        
+        trend = np.full_like(values, np.nan)
+        trend[half:n_obs - half] = sliding_window_view(values, len(kernel), axis=0) @ kernel
+        detrended = values - trend
+        
+        # Average the detrended values per phase of the cycle
+        n_cycles = -(-n_obs // period)
+        padded = np.full((n_cycles * period, values.shape[1]), np.nan)
+        padded[:n_obs] = detrended
+        with np.errstate(invalid='ignore'):
+            phase_means = np.nanmean(padded.reshape(n_cycles, period, -1), axis=0)
+        phase_means -= phase_means.mean(axis=0)
+        seasonal = np.tile(phase_means, (n_cycles, 1))[:n_obs]
+        resid = detrended - seasonal
+        
+        index = data.index
+        return {
+            metric: DecomposeResult(
+                observed=pd.Series(values[:, k], index=index, name=metric),
+                seasonal=pd.Series(seasonal[:, k], index=index, name="seasonal"),
+                trend=pd.Series(trend[:, k], index=index, name="trend"),
+                resid=pd.Series(resid[:, k], index=index, name="resid")
+            )
+            for k, metric in enumerate(metrics)
+        }
+
     def _detect_anomalies(self, data: pd.DataFrame, metrics: List[str]) -> List[Dict]:
         """Detect anomalies in time series data"""
         insights = []
         for metric in metrics:
             try:
-                # Calculate rolling statistics
-                rolling_mean = data[metric].rolling(window=7).mean()
-                rolling_std = data[metric].rolling(window=7).std()
+                values = data[metric].to_numpy(dtype=np.float64, copy=False)
+                if len(values) < 7:
+                    continue
+                
+                # Calculate rolling statistics over 7-point windows
+                windows = sliding_window_view(values, 7)
+                rolling_mean = np.full_like(values, np.nan)
+                rolling_std = np.full_like(values, np.nan)
+                rolling_mean[6:] = windows.mean(axis=-1)
+                rolling_std[6:] = windows.std(axis=-1, ddof=1)
                 
                 # Detect anomalies using z-score
-                z_scores = np.abs((data[metric] - rolling_mean) / rolling_std)
-                anomalies = data[z_scores > 3].index.tolist()
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    z_scores = np.abs((values - rolling_mean) / rolling_std)
+                mask = z_scores > 3
+                anomalies = data.index[mask].tolist()
                 
                 if anomalies:
                     insights.append({
                         "type": "anomaly",
                         "metric": metric,
                         "anomalies": anomalies,
-                        "severity": z_scores[anomalies].tolist(),
+                        "severity": z_scores[mask].tolist(),
                         "context": self._get_anomaly_context(data, metric, anomalies)
                     })
             except Exception as e:
@@ -581,7 +752,7 @@ class MarketReportingSystem:
                 # Prepare data for Prophet
                 df = pd.DataFrame({
                     'ds': data.index,
-                    'y': data[metric]
+                    'y': data[metric].to_numpy(dtype=np.float64, copy=False)
                 })
                 
                 # Fit model and make predictions
@@ -605,23 +776,45 @@ class MarketReportingSystem:
     def _analyze_correlations(self, data: pd.DataFrame) -> List[Dict]:
         """Analyze correlations between metrics"""
         try:
-            # Calculate correlation matrix
-            corr_matrix = data.corr()
-            
-            # Find significant correlations
-            significant_corr = []
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i+1, len(corr_matrix.columns)):
-                    if abs(corr_matrix.iloc[i, j]) > 0.7:
-                        significant_corr.append({
-                            "metric1": corr_matrix.columns[i],
-                            "metric2": corr_matrix.columns[j],
-                            "correlation": corr_matrix.iloc[i, j],
-                            "significance": self._test_correlation_significance(
-                                data[corr_matrix.columns[i]],
-                                data[corr_matrix.columns[j]]
-                            )
-                        })
+            # Calculate correlation matrix with a single GEMM; gaps (e.g. empty
+            # resample periods) need pandas' pairwise-complete correlation
+            numeric = data.select_dtypes(include=np.number)
+            values = numeric.to_numpy(dtype=np.float64, copy=True)
+            present = ~np.isnan(values)
+            if present.all():
+                values -= values.mean(axis=0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values /= values.std(axis=0)
+                    corr = values.T @ values / values.shape[0]
+                pair_counts = np.full(corr.shape, values.shape[0])
+            else:
+                corr = numeric.corr().to_numpy()
+                pair_counts = present.T.astype(np.int64) @ present.astype(np.int64)
+            # Rounding can push coefficients of (anti)collinear metrics past +/-1
+            corr_matrix = pd.DataFrame(
+                np.clip(corr, -1.0, 1.0),
+                index=numeric.columns,
+                columns=numeric.columns
+            )
+            
+            # Find significant correlations on the upper triangle in one pass
+            columns = corr_matrix.columns
+            corr_values = corr_matrix.to_numpy()
+            iu, ju = np.triu_indices_from(corr_values, k=1)
+            pair_corr = corr_values[iu, ju]
+            mask = np.abs(pair_corr) > 0.7
+            i_sel, j_sel, c_sel = iu[mask], ju[mask], pair_corr[mask]
+            p_values = self._test_correlation_significance(c_sel, pair_counts[i_sel, j_sel])
+            
+            significant_corr = [
+                {
+                    "metric1": columns[i],
+                    "metric2": columns[j],
+                    "correlation": c,
+                    "significance": p
+                }
+                for i, j, c, p in zip(i_sel, j_sel, c_sel, p_values)
+            ]
             
             return [{
                 "type": "correlation",
@@ -633,24 +826,32 @@ class MarketReportingSystem:
             self.logger.warning(f"Could not analyze correlations: {str(e)}")
             return []
 
+    def _test_correlation_significance(self, r: np.ndarray, n: Union[int, np.ndarray]) -> np.ndarray:
+        """Two-sided p-values for Pearson coefficients computed from n samples (per coefficient or shared)"""
+        r = np.asarray(r, dtype=np.float64)
+        n = np.broadcast_to(np.asarray(n, dtype=np.float64), r.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = r * np.sqrt((n - 2) / (1.0 - r ** 2))
+            p_values = 2 * stats.t.sf(np.abs(t), n - 2)
+        return np.where(n > 2, p_values, 1.0)
+
     def _analyze_clusters(self, data: pd.DataFrame, metrics: List[str]) -> List[Dict]:
         """Perform cluster analysis"""
         try:
             # Prepare data
-            X = data[metrics].values
-            X_scaled = self.scaler.fit_transform(X)
+            X = data[metrics].to_numpy(dtype=np.float32)
             
-            # Perform PCA
-            X_pca = self.pca.fit_transform(X_scaled)
-            
-            # Perform clustering
-            clusters = self.kmeans.fit_predict(X_pca)
+            # Scale and project in place, then cluster the projection
+            X_pca = self.cluster_pipeline[:-1].fit_transform(X)
+            clusters = self.cluster_pipeline[-1].fit_predict(X_pca)
             
             return [{
                 "type": "cluster",
                 "clusters": self._describe_clusters(data, clusters),
                 "visualization": self._create_cluster_visualization(X_pca, clusters),
-                "silhouette_score": metrics.silhouette_score(X_pca, clusters),
+                "silhouette_score": silhouette_score(
+                    X_pca, clusters, sample_size=min(2000, len(X_pca)), random_state=0
+                ),
                 "recommendations": self._generate_cluster_recommendations(data, clusters)
             }]
         except Exception as e:
@@ -664,22 +865,34 @@ class MarketReportingSystem:
             text_data = data['text'].tolist() if 'text' in data.columns else []
             sentiments = []
             
-            for text in text_data:
-                blob = TextBlob(text)
+            # Run entity extraction through spaCy's batched pipeline
+            docs = list(self.nlp.pipe(text_data, batch_size=64))
+            for text, doc in zip(text_data, docs):
+                scores = self.vader_analyzer.polarity_scores(text)
                 sentiments.append({
                     "text": text,
-                    "polarity": blob.sentiment.polarity,
-                    "subjectivity": blob.sentiment.subjectivity,
-                    "entities": self._extract_entities(text)
+                    "polarity": scores['compound'],
+                    "entities": [(ent.text, ent.label_) for ent in doc.ents]
                 })
+            polarities = np.fromiter((s['polarity'] for s in sentiments), dtype=np.float64, count=len(sentiments))
             
             return [{
                 "type": "sentiment",
-                "overall_sentiment": np.mean([s['polarity'] for s in sentiments]),
+                "overall_sentiment": polarities.mean(),
                 "sentiment_distribution": self._calculate_sentiment_distribution(sentiments),
                 "key_topics": self._extract_key_topics(text_data),
-                "wordcloud": self._generate_wordcloud(text_data)
+                "wordcloud": self._generate_wordcloud(docs)
             }]
         except Exception as e:
             self.logger.warning(f"Could not analyze sentiment: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+
+    def _generate_wordcloud(self, docs: List[Any]) -> Optional[WordCloud]:
+        """Generate a word cloud from already tokenized spaCy docs"""
+        frequencies = Counter(
+            token.lower_ for doc in docs for token in doc
+            if token.is_alpha and not token.is_stop
+        )
+        if not frequencies:
+            return None
+        return WordCloud(width=800, height=400, max_words=100).generate_from_frequencies(frequencies)
@@ -1,16 +1,30 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from scipy import stats
-import pycountry
-import requests
+from numba import njit
 import logging
+import sys
 from pathlib import Path
 
-@dataclass
+def _slot_state(self) -> tuple:
+    """Slot values of a frozen slotted dataclass, for copy and pickle"""
+    return tuple(getattr(self, name) for name in self.__slots__)
+
+def _restore_slot_state(self, state: tuple) -> None:
+    """Set slot values with object.__setattr__, as frozen __setattr__ refuses them"""
+    for name, value in zip(self.__slots__, state):
+        object.__setattr__(self, name, value)
+
+@dataclass(frozen=True)
 class BenchmarkMetric:
+    __slots__ = (
+        "name", "value", "sector_average", "sector_median", "percentile",
+        "trend", "comparison", "confidence", "sample_size", "time_period", "pretty_name"
+    )
+
     name: str
     value: float
     sector_average: float
@@ -22,8 +36,19 @@ class BenchmarkMetric:
     sample_size: int
     time_period: str
 
-@dataclass
+    def __post_init__(self):
+        # Readable label kept in an extra slot; metric names are a small closed set, so intern it
+        object.__setattr__(self, "pretty_name", sys.intern(self.name.replace('_', ' ')))
+
+    __getstate__ = _slot_state
+    __setstate__ = _restore_slot_state
+
+@dataclass(frozen=True)
 class SectorProfile:
+    __slots__ = (
+        "name", "country", "size_category", "main_metrics", "trends", "sample_size", "last_updated"
+    )
+
     name: str
     country: str
     size_category: str
@@ -32,6 +57,80 @@ class SectorProfile:
     sample_size: int
     last_updated: datetime
 
+    __getstate__ = _slot_state
+    __setstate__ = _restore_slot_state
+
+# Deviation from the sector average (%) separating the comparison buckets;
+# values on a boundary fall into the bucket closer to "in line"
+_COMPARISON_BOUNDS = np.array([-20.0, -5.0, 5.0, 20.0])
+_COMPARISON_TEMPLATES = (
+    "Significantly below sector average ({:.1f}% lower)",
+    "Below sector average ({:.1f}% lower)",
+    "In line with sector average",
+    "Above sector average ({:.1f}% higher)",
+    "Significantly above sector average ({:.1f}% higher)"
+)
+
+def _comparison_buckets(avg_diff_percent: np.ndarray) -> np.ndarray:
+    """Map deviations from the sector average to indices into _COMPARISON_TEMPLATES."""
+    return (np.searchsorted(_COMPARISON_BOUNDS[:2], avg_diff_percent, side="right")
+            + np.searchsorted(_COMPARISON_BOUNDS[2:], avg_diff_percent, side="left"))
+
+@njit(cache=True)
+def _percentile_ranks(values: np.ndarray, pct_grid: np.ndarray) -> np.ndarray:
+    """Share of grid points strictly below each value, in percent.
+    
+    ``pct_grid`` is (n, k, p) with sorted rows NaN-padded at the end;
+    empty rows yield NaN.
+    """
+    n, k, p = pct_grid.shape
+    ranks = np.empty((n, k))
+    for i in range(n):
+        for j in range(k):
+            size = 0
+            while size < p and not np.isnan(pct_grid[i, j, size]):
+                size += 1
+            if size == 0:
+                ranks[i, j] = np.nan
+                continue
+            lo, hi = 0, size
+            value = values[i, j]
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if pct_grid[i, j, mid] < value:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            ranks[i, j] = lo / size * 100.0
+    return ranks
+
+@lru_cache(maxsize=256)
+def _title(label: str) -> str:
+    """Title-case a metric label; cached since labels repeat across insights."""
+    return label.title()
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+TREND_LABELS = ("increasing", "stable", "decreasing")
+_TREND_DTYPE = pd.CategoricalDtype(TREND_LABELS)
+
+def benchmarks_to_metrics(benchmarks: pd.DataFrame) -> List[BenchmarkMetric]:
+    """Convert a benchmarks frame (indexed by metric name) into BenchmarkMetric objects."""
+    return [
+        BenchmarkMetric(
+            name=name,
+            value=float(row.value),
+            sector_average=float(row.sector_average),
+            sector_median=float(row.sector_median),
+            percentile=float(row.percentile),
+            trend=row.trend,
+            comparison=row.comparison,
+            confidence=float(row.confidence),
+            sample_size=int(row.sample_size),
+            time_period=row.time_period
+        )
+        for name, row in zip(benchmarks.index, benchmarks.itertuples(index=False))
+    ]
+
 class SectorBenchmarking:
     def __init__(self):
         """Initialize the sector benchmarking system."""
@@ -75,128 +174,239 @@ class SectorBenchmarking:
         return logger
 
     def _load_sector_data(self):
-        """Load sector benchmark data from various sources."""
-        self.sector_data = {
-            "e-commerce": {
-                "portugal": {
-                    "metrics": {
-                        "net_margin": {
-                            "average": 0.15,
-                            "median": 0.12,
-                            "percentiles": [0.05, 0.08, 0.12, 0.18, 0.25],
-                            "sample_size": 150
-                        },
-                        "gross_margin": {
-                            "average": 0.45,
-                            "median": 0.42,
-                            "percentiles": [0.25, 0.35, 0.42, 0.50, 0.60],
-                            "sample_size": 150
-                        },
-                        # Add more metrics as needed
-                    },
-                    "trends": {
-                        "2024": {
-                            "net_margin": 0.15,
-                            "gross_margin": 0.45
-                        },
-                        "2023": {
-                            "net_margin": 0.14,
-                            "gross_margin": 0.44
-                        }
-                        # Add more historical data
-                    }
-                }
-                # Add more countries
+        """Load sector benchmark data from the Parquet benchmark tables."""
+        categorical = {"sector": "category", "country": "category", "metric": "category"}
+        benchmarks = pd.read_parquet(DATA_DIR / "sector_benchmarks.parquet").astype(categorical)
+        trends = pd.read_parquet(DATA_DIR / "sector_trends.parquet").astype(categorical)
+        
+        self._build_benchmark_arrays(benchmarks)
+        
+        # Precompute the year-over-year trend label for every (sector, country, metric, year)
+        trend_values = dict(zip(
+            zip(trends["sector"], trends["country"], trends["metric"], trends["year"].astype(int)),
+            trends["value"].astype(float)
+        ))
+        self._trend_change = {}
+        for (sector, country, metric, year), current in trend_values.items():
+            previous = trend_values.get((sector, country, metric, year - 1))
+            if previous:
+                self._trend_change[(sector, country, metric, year)] = self._classify_trend(
+                    (current - previous) / previous * 100
+                )
+        
+        # Nested view used for sector profiles
+        self.sector_data = {}
+        for row in benchmarks.itertuples(index=False):
+            country_data = self.sector_data.setdefault(row.sector, {}).setdefault(
+                row.country, {"metrics": {}, "trends": {}}
+            )
+            country_data["metrics"][row.metric] = {
+                "average": row.average,
+                "median": row.median,
+                "percentiles": np.asarray(row.percentiles, dtype=np.float64),
+                "sample_size": row.sample_size
             }
-            # Add more sectors
-        }
+        for row in trends.itertuples(index=False):
+            country_data = self.sector_data.setdefault(row.sector, {}).setdefault(
+                row.country, {"metrics": {}, "trends": {}}
+            )
+            country_data["trends"].setdefault(str(row.year), {})[row.metric] = row.value
+
+    def _build_benchmark_arrays(self, benchmarks: pd.DataFrame):
+        """Flatten the benchmark table into (metric, sector/country) arrays."""
+        sc_keys = list(zip(benchmarks["sector"], benchmarks["country"]))
+        self._sc_index = {key: i for i, key in enumerate(dict.fromkeys(sc_keys))}
+        self._metric_index = {metric: i for i, metric in enumerate(benchmarks["metric"].cat.categories)}
+        
+        m_ids = benchmarks["metric"].cat.codes.to_numpy(dtype=np.intp)
+        sc_ids = np.fromiter((self._sc_index[key] for key in sc_keys), dtype=np.intp, count=len(sc_keys))
+        grids = benchmarks["percentiles"].tolist()
+        
+        n_metrics, n_sc = len(self._metric_index), len(self._sc_index)
+        n_pct = max((len(grid) for grid in grids), default=0)
+        self._avg = np.full((n_metrics, n_sc), np.nan)
+        self._med = np.full((n_metrics, n_sc), np.nan)
+        self._pct = np.full((n_metrics, n_sc, n_pct), np.nan)
+        self._sample_size = np.zeros((n_metrics, n_sc), dtype=np.int64)
+        
+        self._avg[m_ids, sc_ids] = benchmarks["average"].to_numpy(dtype=np.float64)
+        self._med[m_ids, sc_ids] = benchmarks["median"].to_numpy(dtype=np.float64)
+        self._sample_size[m_ids, sc_ids] = benchmarks["sample_size"].to_numpy(dtype=np.int64)
+        for m_id, sc_id, grid in zip(m_ids, sc_ids, grids):
+            self._pct[m_id, sc_id, :len(grid)] = grid
 
     def analyze_sector_performance(self, 
                                  metrics: Dict[str, float],
                                  sector: str,
                                  country: str,
-                                 year: int = None) -> Dict[str, Any]:
-        """Analyze company performance against sector benchmarks."""
+                                 year: int = None,
+                                 now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Analyze company performance against sector benchmarks.
+        
+        Callers looping over many companies can pass a single ``now`` to share
+        one timestamp; see ``analyze_sector_performance_batch`` for bulk scoring.
+        """
         try:
             self.logger.info(f"Analyzing sector performance for {sector} in {country}")
             
+            if now is None:
+                now = datetime.now()
             if year is None:
-                year = datetime.now().year
+                year = now.year
                 
-            benchmark_results = []
-            sector_insights = []
+            # Score the company as a one-row batch; unknown sectors have nothing to compare
+            names = [name for name in metrics if name in self._metric_index]
+            if (sector, country) not in self._sc_index:
+                names = []
+            values = np.fromiter((metrics[name] for name in names), dtype=np.float64, count=len(names))
+            sc_ids = np.array([self._sc_index.get((sector, country), -1)], dtype=np.intp)
+            scores = self._score_benchmarks(values[None, :], sc_ids, names)
+            trends = [self._analyze_trend(sector, country, name, year) for name in names]
             
-            # Get sector data
-            sector_metrics = self.sector_data.get(sector, {}).get(country, {}).get("metrics", {})
+            # Build the metric objects straight from the score arrays; the frame is only the return value
+            kept = np.flatnonzero(scores["valid"][0])
+            time_period = str(year)
+            benchmark_results = [
+                BenchmarkMetric(
+                    name=names[k],
+                    value=float(values[k]),
+                    sector_average=float(scores["average"][0, k]),
+                    sector_median=float(scores["median"][0, k]),
+                    percentile=float(scores["percentile"][0, k]),
+                    trend=trends[k],
+                    comparison=self._generate_comparison(
+                        int(scores["bucket"][0, k]), float(scores["avg_diff_percent"][0, k])
+                    ),
+                    confidence=0.95,
+                    sample_size=int(scores["sample_size"][0, k]),
+                    time_period=time_period
+                )
+                for k in kept
+            ]
+            benchmarks = pd.DataFrame({
+                "value": values[kept],
+                "sector_average": scores["average"][0, kept],
+                "sector_median": scores["median"][0, kept],
+                "percentile": scores["percentile"][0, kept],
+                "trend": pd.Categorical.from_codes(
+                    [TREND_LABELS.index(b.trend) for b in benchmark_results], dtype=_TREND_DTYPE
+                ),
+                "comparison": pd.Categorical([b.comparison for b in benchmark_results]),
+                "confidence": np.full(len(kept), 0.95),
+                "sample_size": scores["sample_size"][0, kept],
+                "time_period": time_period
+            }, index=pd.CategoricalIndex([b.name for b in benchmark_results], name="name"))
             
-            # Compare each metric
-            for metric_name, value in metrics.items():
-                if metric_name in sector_metrics:
-                    sector_data = sector_metrics[metric_name]
-                    
-                    # Calculate percentile
-                    percentile = self._calculate_percentile(value, sector_data["percentiles"])
-                    
-                    # Determine trend
-                    trend = self._analyze_trend(sector, country, metric_name, year)
-                    
-                    # Generate comparison insight
-                    comparison = self._generate_comparison(
-                        value,
-                        sector_data["average"],
-                        sector_data["median"],
-                        metric_name
-                    )
-                    
-                    benchmark = BenchmarkMetric(
-                        name=metric_name,
-                        value=value,
-                        sector_average=sector_data["average"],
-                        sector_median=sector_data["median"],
-                        percentile=percentile,
-                        trend=trend,
-                        comparison=comparison,
-                        confidence=0.95,
-                        sample_size=sector_data["sample_size"],
-                        time_period=str(year)
-                    )
-                    benchmark_results.append(benchmark)
-                    
-                    # Generate sector insights
-                    insight = self._generate_sector_insight(benchmark)
-                    sector_insights.append(insight)
+            # Generate sector insights
+            sector_insights = [self._generate_sector_insight(benchmark) for benchmark in benchmark_results]
             
             return {
-                "benchmarks": benchmark_results,
+                "benchmarks": benchmarks,
                 "insights": sector_insights,
-                "sector_profile": self._get_sector_profile(sector, country, year),
-                "recommendations": self._generate_recommendations(benchmark_results),
-                "analysis_timestamp": datetime.now().isoformat()
+                "sector_profile": self._get_sector_profile(sector, country, year, now),
+                "recommendations": list(self._generate_recommendations(benchmark_results)),
+                "analysis_timestamp": now.isoformat()
             }
             
         except Exception as e:
             self.logger.error(f"Error analyzing sector performance: {str(e)}")
             raise
 
-    def _calculate_percentile(self, value: float, percentiles: List[float]) -> float:
-        """Calculate the percentile of a value within the sector."""
-        for i, p in enumerate(percentiles):
-            if value <= p:
-                return (i / len(percentiles)) * 100
-        return 100.0
+    def analyze_sector_performance_batch(self,
+                                         companies: pd.DataFrame,
+                                         sector_col: str = "sector",
+                                         country_col: str = "country",
+                                         metric_cols: Optional[List[str]] = None,
+                                         year: int = None) -> pd.DataFrame:
+        """Benchmark many companies at once.
+        
+        Returns one row per (company, benchmarked metric), indexed by the
+        company's index label in ``companies``.
+        """
+        try:
+            if year is None:
+                year = datetime.now().year
+            if metric_cols is None:
+                metric_cols = [col for col in companies.columns if col not in (sector_col, country_col)]
+            names = [col for col in metric_cols if col in self._metric_index]
+            
+            values = companies[names].to_numpy(dtype=np.float64)
+            sc_ids = np.fromiter(
+                (self._sc_index.get(key, -1) for key in zip(companies[sector_col], companies[country_col])),
+                dtype=np.intp,
+                count=len(companies)
+            )
+            scores = self._score_benchmarks(values, sc_ids, names)
+            
+            rows, cols = np.nonzero(scores["valid"])
+            buckets = scores["bucket"][rows, cols]
+            avg_diff_percent = scores["avg_diff_percent"][rows, cols]
+            return pd.DataFrame({
+                "metric": pd.Categorical.from_codes(cols, categories=names) if names else [],
+                "value": values[rows, cols],
+                "sector_average": scores["average"][rows, cols],
+                "sector_median": scores["median"][rows, cols],
+                "percentile": scores["percentile"][rows, cols],
+                "trend": pd.Categorical(
+                    self._trends_for(names, year)[sc_ids[rows], cols] if len(rows) else [],
+                    categories=TREND_LABELS
+                ),
+                "comparison_bucket": buckets,
+                "comparison": [
+                    self._generate_comparison(int(bucket), float(diff))
+                    for bucket, diff in zip(buckets, avg_diff_percent)
+                ],
+                "sample_size": scores["sample_size"][rows, cols]
+            }, index=companies.index[rows])
+        except Exception as e:
+            self.logger.error(f"Error analyzing sector performance batch: {str(e)}")
+            raise
 
-    def _analyze_trend(self, sector: str, country: str, metric: str, year: int) -> str:
-        """Analyze the trend of a metric over time."""
-        trends = self.sector_data.get(sector, {}).get(country, {}).get("trends", {})
+    def _score_benchmarks(self, values: np.ndarray, sc_ids: np.ndarray, names: List[str]) -> Dict[str, np.ndarray]:
+        """Compare an (n_companies, n_metrics) value matrix with the sector benchmark arrays."""
+        n_rows, n_cols = values.shape
+        m_ids = np.fromiter((self._metric_index[name] for name in names), dtype=np.intp, count=n_cols)
+        known = sc_ids >= 0
+        safe_sc = np.where(known, sc_ids, 0)
         
-        current = trends.get(str(year), {}).get(metric)
-        previous = trends.get(str(year-1), {}).get(metric)
+        if self._avg.size and n_cols:
+            averages = np.where(known[:, None], self._avg[m_ids][:, safe_sc].T, np.nan)
+            medians = np.where(known[:, None], self._med[m_ids][:, safe_sc].T, np.nan)
+            sample_sizes = self._sample_size[m_ids][:, safe_sc].T
+            pct_grid = self._pct[m_ids][:, safe_sc].transpose(1, 0, 2)
+        else:
+            averages = medians = np.full((n_rows, n_cols), np.nan)
+            sample_sizes = np.zeros((n_rows, n_cols), dtype=np.int64)
+            pct_grid = np.full((n_rows, n_cols, 0), np.nan)
         
-        if current is None or previous is None:
-            return "stable"
-            
-        change = ((current - previous) / previous) * 100
+        percentiles = _percentile_ranks(np.ascontiguousarray(values), np.ascontiguousarray(pct_grid))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_diff_percent = (values - averages) / averages * 100.0
         
+        return {
+            "average": averages,
+            "median": medians,
+            "sample_size": sample_sizes,
+            "percentile": percentiles,
+            "avg_diff_percent": avg_diff_percent,
+            "bucket": _comparison_buckets(avg_diff_percent),
+            "valid": ~np.isnan(averages) & ~np.isnan(values)
+        }
+
+    def _trends_for(self, names: List[str], year: int) -> np.ndarray:
+        """Trend labels as an (n_sector_countries, n_metrics) array for the given year."""
+        trends = np.empty((len(self._sc_index), len(names)), dtype=object)
+        for (sector, country), sc_id in self._sc_index.items():
+            trends[sc_id] = [self._analyze_trend(sector, country, name, year) for name in names]
+        return trends
+
+    def _analyze_trend(self, sector: str, country: str, metric: str, year: int) -> str:
+        """Analyze the trend of a metric over time."""
+        return self._trend_change.get((sector, country, metric, year), "stable")
+
+    @staticmethod
+    def _classify_trend(change: float) -> str:
+        """Label a year-over-year percentage change."""
         if change > 5:
             return "increasing"
         elif change < -5:
@@ -204,29 +414,17 @@ class SectorBenchmarking:
         else:
             return "stable"
 
-    def _generate_comparison(self, value: float, average: float, median: float, metric_name: str) -> str:
-        """Generate a comparison insight for a metric."""
-        avg_diff_percent = ((value - average) / average) * 100
-        med_diff_percent = ((value - median) / median) * 100
-        
-        if avg_diff_percent > 20:
-            return f"Significantly above sector average ({avg_diff_percent:.1f}% higher)"
-        elif avg_diff_percent > 5:
-            return f"Above sector average ({avg_diff_percent:.1f}% higher)"
-        elif avg_diff_percent < -20:
-            return f"Significantly below sector average ({-avg_diff_percent:.1f}% lower)"
-        elif avg_diff_percent < -5:
-            return f"Below sector average ({-avg_diff_percent:.1f}% lower)"
-        else:
-            return "In line with sector average"
+    def _generate_comparison(self, bucket: int, avg_diff_percent: float) -> str:
+        """Generate a comparison insight for a metric from its deviation bucket."""
+        return _COMPARISON_TEMPLATES[bucket].format(abs(avg_diff_percent))
 
     def _generate_sector_insight(self, benchmark: BenchmarkMetric) -> Dict[str, str]:
         """Generate detailed insights for a benchmark metric."""
         return {
             "metric": benchmark.name,
-            "summary": f"{benchmark.name.replace('_', ' ').title()}: {benchmark.comparison}",
+            "summary": f"{_title(benchmark.pretty_name)}: {benchmark.comparison}",
             "detail": (
-                f"Your {benchmark.name.replace('_', ' ')} of {benchmark.value:.1%} is at the "
+                f"Your {benchmark.pretty_name} of {benchmark.value:.1%} is at the "
                 f"{benchmark.percentile:.0f}th percentile of the sector. "
                 f"The sector average is {benchmark.sector_average:.1%} and the trend is {benchmark.trend}."
             ),
@@ -234,7 +432,7 @@ class SectorBenchmarking:
             "confidence": f"Based on a sample of {benchmark.sample_size} companies"
         }
 
-    def _get_sector_profile(self, sector: str, country: str, year: int) -> SectorProfile:
+    def _get_sector_profile(self, sector: str, country: str, year: int, now: datetime) -> SectorProfile:
         """Get the profile of a sector in a specific country."""
         sector_data = self.sector_data.get(sector, {}).get(country, {})
         
@@ -245,33 +443,33 @@ class SectorBenchmarking:
             main_metrics=sector_data.get("metrics", {}),
             trends=sector_data.get("trends", {}),
             sample_size=150,  # Example value
-            last_updated=datetime.now()
+            last_updated=now
         )
 
-    def _generate_recommendations(self, benchmarks: List[BenchmarkMetric]) -> List[Dict[str, str]]:
+    def _generate_recommendations(self, benchmarks: List[BenchmarkMetric]) -> Iterator[Dict[str, str]]:
         """Generate recommendations based on benchmark comparisons."""
-        recommendations = []
-        
         for benchmark in benchmarks:
+            if 25 <= benchmark.percentile <= 75:
+                continue
+            
+            label = benchmark.pretty_name
             if benchmark.percentile < 25:
-                recommendations.append({
+                yield {
                     "metric": benchmark.name,
                     "priority": "high",
-                    "action": f"Improve {benchmark.name.replace('_', ' ')} to meet sector standards",
+                    "action": f"Improve {label} to meet sector standards",
                     "detail": (
-                        f"Your {benchmark.name.replace('_', ' ')} is in the bottom quartile. "
+                        f"Your {label} is in the bottom quartile. "
                         f"Consider implementing industry best practices to improve this metric."
                     )
-                })
-            elif benchmark.percentile > 75:
-                recommendations.append({
+                }
+            else:
+                yield {
                     "metric": benchmark.name,
                     "priority": "low",
-                    "action": f"Maintain strong {benchmark.name.replace('_', ' ')} performance",
+                    "action": f"Maintain strong {label} performance",
                     "detail": (
-                        f"Your {benchmark.name.replace('_', ' ')} is in the top quartile. "
+                        f"Your {label} is in the top quartile. "
                         f"Document and maintain current practices."
                     )
-                })
-        
-        return recommendations 
\ No newline at end of file
+                }
@@ -1,96 +1,38 @@
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from datetime import datetime, timedelta
+import hashlib
 import json
+import operator
 import pandas as pd
 import numpy as np
+from numba import njit, prange
+import joblib
 from enum import Enum
-import requests
-from bs4 import BeautifulSoup
+from types import MappingProxyType
+from selectolax.lexbor import LexborHTMLParser
 import re
 import os
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import torch
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from aiohttp import ClientSession
 import aiohttp
 import psutil
 import time
-from typing import Dict, List, Optional, Tuple, Any
-import json
-from pathlib import Path
-import yaml
-import markdown
-from jinja2 import Template
-import schedule
-import threading
-from collections import defaultdict
-import statistics
-from datetime import datetime, timedelta
-import pytz
-from typing import Dict, List, Optional, Tuple, Any, Set
-import json
-from pathlib import Path
-import yaml
-import markdown
-from jinja2 import Template
-import schedule
-import threading
-from collections import defaultdict
-import statistics
-from datetime import datetime, timedelta
-import pytz
-import spacy
-from spacy.lang.en import English
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import re
-import string
-from typing import Dict, List, Optional, Tuple, Any, Set
-import json
-from pathlib import Path
-import yaml
-import markdown
-from jinja2 import Template
-import schedule
-import threading
-from collections import defaultdict
-import statistics
-from datetime import datetime, timedelta
-import pytz
-import spacy
-from spacy.lang.en import English
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import re
-import string
-from typing import Dict, List, Optional, Tuple, Any, Set
-import json
 from pathlib import Path
 import yaml
 import markdown
 from jinja2 import Template
 import schedule
 import threading
-from collections import defaultdict
-import statistics
-from datetime import datetime, timedelta
+from collections import OrderedDict, deque
 import pytz
-import spacy
-from spacy.lang.en import English
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import re
 import string
 
 class MigrationStep(Enum):
@@ -187,6 +129,37 @@ class PerformanceMetrics:
     firewall_status: bool
     backup_status: bool
 
+# Metrics a measurement did not cover are None, and NaN in the history matrix
+NUMERIC_FIELDS = tuple(f.name for f in fields(PerformanceMetrics) if f.type in (float, int))
+_GET_NUMERIC = operator.attrgetter(*NUMERIC_FIELDS)
+
+def _compensated_append(total: np.ndarray, err: np.ndarray, n: int, values: np.ndarray):
+    """Set prefix row n + 1 to row n plus values, keeping each addition's rounding error in err"""
+    # Knuth's TwoSum recovers the exact error of the float64 addition
+    s = total[n] + values
+    b = s - total[n]
+    total[n + 1] = s
+    err[n + 1] = err[n] + ((total[n] - (s - b)) + (values - b))
+
+@njit("float64[:, :](float32[:, :])", parallel=True, cache=True)
+def _benchmark_kernel(values):
+    """Compute mean, median and sample standard deviation of each column, skipping NaN"""
+    f = values.shape[1]
+    out = np.empty((f, 3))
+    for j in prange(f):
+        # Accumulate in float64 over the observed (non-NaN) float32 history
+        col = values[:, j].astype(np.float64)
+        col = col[~np.isnan(col)]
+        n = col.size
+        if n == 0:
+            out[j, :] = np.nan
+            continue
+        mean = col.mean()
+        out[j, 0] = mean
+        out[j, 1] = np.median(col)
+        out[j, 2] = np.sqrt(((col - mean) ** 2).sum() / (n - 1)) if n > 1 else 0.0
+    return out
+
 @dataclass
 class PerformanceReport:
     date: datetime
@@ -221,18 +194,142 @@ class ChatbotIntent(Enum):
     BENCHMARKING = "benchmarking"
     FORECASTING = "forecasting"
 
+# Unambiguous keywords that route a message without running the NLP models
+INTENT_KEYWORDS = {
+    ChatbotIntent.MIGRATION: ("migrate", "migrating", "migration", "dns", "hosting provider"),
+    ChatbotIntent.SEO: ("seo", "keyword", "keywords", "backlink", "backlinks", "search ranking", "search rankings"),
+    ChatbotIntent.PERFORMANCE: ("performance", "page speed", "load time", "slow"),
+    ChatbotIntent.SECURITY: ("security", "ssl", "malware", "vulnerability", "vulnerabilities", "firewall", "hacked"),
+    ChatbotIntent.ANALYTICS: ("analytics", "traffic", "visitors", "bounce rate"),
+    ChatbotIntent.SUPPORT: ("support", "contact", "help desk"),
+    ChatbotIntent.TRAINING: ("training", "tutorial", "course"),
+    ChatbotIntent.DOCUMENTATION: ("documentation", "docs", "manual"),
+    ChatbotIntent.TROUBLESHOOTING: ("troubleshoot", "troubleshooting", "broken", "not working"),
+    ChatbotIntent.OPTIMIZATION: ("optimize", "optimise", "optimization", "optimisation"),
+    ChatbotIntent.REPORTING: ("report", "reports", "reporting"),
+    ChatbotIntent.ALERTS: ("alert", "alerts", "notification", "notifications"),
+    ChatbotIntent.RECOMMENDATIONS: ("recommend", "recommendation", "recommendations", "suggestion", "suggestions"),
+    ChatbotIntent.COMPARISON: ("compare", "comparison", "versus"),
+    ChatbotIntent.BENCHMARKING: ("benchmark", "benchmarks", "benchmarking", "industry average"),
+    ChatbotIntent.FORECASTING: ("forecast", "forecasting", "predict", "prediction", "projection"),
+}
+_KEYWORD_INTENTS = {keyword: intent for intent, keywords in INTENT_KEYWORDS.items() for keyword in keywords}
+_INTENT_KEYWORD_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(k) for k in sorted(_KEYWORD_INTENTS, key=len, reverse=True)) + r")\b"
+)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def _parse_page(html: str) -> Dict[str, Any]:
+    """Extract on-page signals from raw HTML"""
+    tree = LexborHTMLParser(html)
+    title = tree.css_first("title")
+    description = tree.css_first('meta[name="description"]')
+    images = tree.css("img")
+    text = tree.body.text(separator=" ") if tree.body is not None else ""
+    return {
+        "html_bytes": len(html.encode()),
+        "title": title.text(strip=True) if title is not None else "",
+        "meta_description": (description.attributes.get("content") or "") if description is not None else "",
+        "links": len(tree.css("a[href]")),
+        "images": len(images),
+        "images_missing_alt": sum(1 for img in images if not img.attributes.get("alt")),
+        "scripts": len(tree.css("script[src]")),
+        "stylesheets": len(tree.css('link[rel="stylesheet"]')),
+        "word_count": len(text.split())
+    }
+
+CLASSIFIER_MODEL = "distilbert-base-uncased"
+SUMMARIZER_MODEL = "sshleifer/distilbart-cnn-12-6"
+
+@lru_cache(maxsize=1)
+def _get_spacy():
+    """Load the spaCy pipeline without the components intent parsing never uses"""
+    import spacy
+    return spacy.load("en_core_web_sm", disable=["parser", "ner"])
+
+@lru_cache(maxsize=1)
+def _get_bart_tokenizer():
+    """Load the summarization tokenizer"""
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(SUMMARIZER_MODEL)
+
+@lru_cache(maxsize=1)
+def _get_bart_model():
+    """Load the summarization model"""
+    from transformers import AutoModelForSeq2SeqLM
+    return AutoModelForSeq2SeqLM.from_pretrained(SUMMARIZER_MODEL).eval()
+
+@lru_cache(maxsize=1)
+def _get_lemmatizer():
+    """Load the NLTK WordNet lemmatizer"""
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
+@lru_cache(maxsize=1)
+def _get_stop_words():
+    """Load the English NLTK stop words"""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+@lru_cache(maxsize=1)
+def _get_classifier():
+    """Load the text classification pipeline"""
+    from transformers import pipeline
+    return pipeline("text-classification", model=CLASSIFIER_MODEL)
+
+CHAT_HISTORY_SIZE = 1024
+USER_HISTORY_SIZE = 256
+
+_DEFAULT_PROFILE = MappingProxyType({"role": "user", "expertise_level": "beginner"})
+
+class UserProfileDict(dict):
+    """User profiles keyed by user id, created from the default profile on first access"""
+
+    def __missing__(self, user_id: str) -> Dict:
+        profile = self[user_id] = {**_DEFAULT_PROFILE, "preferences": {}, "history": deque(maxlen=USER_HISTORY_SIZE)}
+        return profile
+
 class SiteAdvisor:
-    def __init__(self, api_key: str = None):
+    _HISTORY_CAPACITY = 256
+    _PREFIX_SUMS = (
+        "_cum_n", "_cum_x", "_cum_xx", "_cum_y", "_cum_xy", "_cum_yy", "_cum_y_err", "_cum_xy_err", "_cum_yy_err"
+    )
+    _MAX_CONCURRENT_FETCHES = 50
+    _RESPONSE_CACHE_SIZE = 4096
+    # NLP models are shared across instances and loaded on first use
+    _LAZY_MODELS = {
+        "nlp": _get_spacy,
+        "tokenizer": _get_bart_tokenizer,
+        "model": _get_bart_model,
+        "classifier": _get_classifier,
+        "lemmatizer": _get_lemmatizer,
+        "stop_words": _get_stop_words,
+    }
+
+    def __init__(self, api_key: str = None, cache_dir: Optional[str] = None):
         self.api_key = api_key
+        # Startup artifacts are cached on disk only when a directory is given
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
         self.migration_steps = self._load_migration_steps()
         self.seo_factors = self._load_seo_factors()
         self.performance_history = []
+        # Long-lived pool for parsing fetched pages, started on first use
+        self._parse_pool = None
         self.setup_logging()
         self.setup_nlp()
         self.setup_analytics()
         self.setup_security()
         self.setup_reporting()
         self.setup_chatbot()
+
+    def __getattr__(self, name: str):
+        """Load shared NLP models the first time they are accessed"""
+        loader = SiteAdvisor._LAZY_MODELS.get(name)
+        if loader is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        value = loader()
+        setattr(self, name, value)
+        return value
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -244,17 +341,31 @@ class SiteAdvisor:
 
     def setup_nlp(self):
         """Setup NLP models for chatbot"""
-        self.nlp = spacy.load("en_core_web_sm")
-        self.tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
-        self.model = AutoModelForSeq2SeqLM.from_pretrained("facebook/bart-large-cnn")
-        self.classifier = pipeline("text-classification", model="distilbert-base-uncased")
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
+        # NLP models and NLTK resources resolve lazily via __getattr__
 
     def setup_analytics(self):
         """Setup analytics tracking"""
-        self.analytics_data = defaultdict(list)
-        self.benchmarks = self._load_benchmarks()
+        self._n = 0
+        self._metrics_matrix = np.empty((self._HISTORY_CAPACITY, len(NUMERIC_FIELDS)), dtype=np.float32)
+        self._dates = np.empty(self._HISTORY_CAPACITY, dtype='datetime64[us]')
+        # Exact integer prefix sums of the count, x and x*x of the rows where
+        # each metric was observed (x = row index), and float64 prefix sums of
+        # y, x*y and y*y; unobserved (NaN) entries add nothing to any of them.
+        # y is shifted by the metric's first observed value so the sums stay
+        # near the data's spread rather than its magnitude, and each float sum
+        # carries the rounding error of its additions in a *_err companion
+        self._cum_n = np.zeros((self._HISTORY_CAPACITY + 1, len(NUMERIC_FIELDS)), dtype=np.int64)
+        self._cum_x = np.zeros((self._HISTORY_CAPACITY + 1, len(NUMERIC_FIELDS)), dtype=np.int64)
+        self._cum_xx = np.zeros((self._HISTORY_CAPACITY + 1, len(NUMERIC_FIELDS)), dtype=np.int64)
+        for name in ("_cum_y", "_cum_xy", "_cum_yy", "_cum_y_err", "_cum_xy_err", "_cum_yy_err"):
+            setattr(self, name, np.zeros((self._HISTORY_CAPACITY + 1, len(NUMERIC_FIELDS))))
+        self._y_shift = np.full(len(NUMERIC_FIELDS), np.nan)
+        self.benchmarks = self._load_cached("benchmarks", self._load_benchmarks)
+        # Kept in float64: comparisons report these values as they are
+        self._benchmark_vec = np.array(
+            [self.benchmarks.get(metric, {}).get("average", 0) for metric in NUMERIC_FIELDS],
+            dtype=np.float64
+        )
         self.competitors = self._load_competitors()
 
     def setup_security(self):
@@ -271,10 +382,48 @@ class SiteAdvisor:
 
     def setup_chatbot(self):
         """Setup chatbot capabilities"""
-        self.chat_history = []
-        self.user_profiles = {}
-        self.knowledge_base = self._load_knowledge_base()
-        self.intent_classifier = self._train_intent_classifier()
+        self.chat_history = deque(maxlen=CHAT_HISTORY_SIZE)
+        self.user_profiles = UserProfileDict()
+        self.knowledge_base = self._load_cached("knowledge_base", self._load_knowledge_base)
+        self._response_cache = OrderedDict()
+        self.intent_classifier = self._load_cached("intent_classifier", self._train_intent_classifier)
+        # Handlers follow the _handle_<intent>_query naming convention
+        self._intent_handlers = {
+            intent: handler
+            for intent in ChatbotIntent
+            if (handler := getattr(self, f"_handle_{intent.value}_query", None)) is not None
+        }
+
+    def _load_cached(self, name: str, builder: Callable[[], Any], sources: Tuple[str, ...] = ()) -> Any:
+        """Load a startup artifact from the opt-in disk cache, building it on a miss"""
+        if self.cache_dir is None:
+            return builder()
+        
+        # Key on the builder's code and on the files it reads (their paths,
+        # modification times and contents), so editing either invalidates it
+        code = builder.__code__
+        key = hashlib.blake2b(digest_size=16)
+        key.update(json.dumps(
+            {"name": name, "code": code.co_code.hex(), "consts": repr(code.co_consts)}, sort_keys=True
+        ).encode())
+        for source in sources:
+            source = Path(source).resolve()
+            key.update(f"{source}:{source.stat().st_mtime_ns}".encode())
+            key.update(hashlib.blake2b(source.read_bytes()).digest())
+        path = self.cache_dir / f"{name}-{key.hexdigest()}.joblib"
+        if path.exists():
+            try:
+                return joblib.load(path)
+            except Exception as e:
+                self.logger.warning(f"Ignoring unreadable cache {path}: {str(e)}")
+        
+        artifact = builder()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            joblib.dump(artifact, path, compress=3)
+        except OSError as e:
+            self.logger.warning(f"Could not write cache {path}: {str(e)}")
+        return artifact
 
     def _load_migration_steps(self) -> Dict:
         """Load migration steps and their details"""
@@ -368,65 +517,144 @@ class SiteAdvisor:
             # Get current metrics
             metrics = self._fetch_metrics(url)
             
-            # Store in history
-            self.performance_history.append({
-                "date": datetime.now(),
-                "metrics": metrics
-            })
-            
-            # Update analytics data
-            self._update_analytics_data(metrics)
-            
-            # Check for anomalies
+            # Check for anomalies against the history seen so far
             self._check_for_anomalies(metrics)
             
+            # Store in history and update analytics data
+            self._update_analytics_data(metrics, datetime.now())
+            
             return metrics
         except Exception as e:
             self.logger.error(f"Error analyzing performance: {str(e)}")
             raise
 
+    def analyze_performance_many(self, urls: List[str]) -> Dict[str, Optional[PerformanceMetrics]]:
+        """Analyze performance metrics for several websites concurrently"""
+        return asyncio.run(self.analyze_performance_many_async(urls))
+
+    async def analyze_performance_many_async(self, urls: List[str]) -> Dict[str, Optional[PerformanceMetrics]]:
+        """Analyze performance metrics for several websites concurrently"""
+        semaphore = asyncio.Semaphore(self._MAX_CONCURRENT_FETCHES)
+        loop = asyncio.get_running_loop()
+        pool = self._get_parse_pool()
+
+        async def analyze(session: ClientSession, url: str) -> Optional[PerformanceMetrics]:
+            try:
+                async with semaphore:
+                    html, first_byte_time, response_time = await self._fetch_page_async(session, url)
+                # Parse in a worker process so HTML parsing doesn't stall the event loop
+                page = await loop.run_in_executor(pool, _parse_page, html)
+                return self._build_metrics(url, page, first_byte_time, response_time)
+            except Exception as e:
+                self.logger.error(f"Error analyzing performance for {url}: {str(e)}")
+                return None
+
+        connector = aiohttp.TCPConnector(limit=self._MAX_CONCURRENT_FETCHES)
+        async with ClientSession(connector=connector) as session:
+            results = await asyncio.gather(*(analyze(session, url) for url in urls))
+
+        # Record results in request order once all fetches are done
+        recorded_at = datetime.now()
+        for metrics in results:
+            if metrics is not None:
+                self._check_for_anomalies(metrics)
+                self._update_analytics_data(metrics, recorded_at)
+        return dict(zip(urls, results))
+
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """Return the HTML parsing process pool, starting it on first use"""
+        # Workers are spawned rather than forked: forking after numba's
+        # parallel threading layer has started can deadlock the children
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        return self._parse_pool
+
+    def close(self):
+        """Shut down the HTML parsing process pool"""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+
+    async def _fetch_page_async(self, session: ClientSession, url: str) -> Tuple[str, float, float]:
+        """Fetch a page, returning its HTML, time to first byte and response time in seconds"""
+        started = time.perf_counter()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            first_byte_time = time.perf_counter() - started
+            response.raise_for_status()
+            html = await response.text()
+        return html, first_byte_time, time.perf_counter() - started
+
+    def _build_metrics(self, url: str, page: Dict[str, Any], first_byte_time: float,
+                       response_time: float) -> PerformanceMetrics:
+        """Build performance metrics from a single fetch of a page"""
+        # Traffic, engagement, business and scan results need analytics or
+        # scanner data a page fetch cannot observe, so they stay None; so does
+        # the server's own response time, which the client cannot separate from
+        # network time
+        values = dict.fromkeys(f.name for f in fields(PerformanceMetrics))
+        
+        # On-page SEO checks, each worth an equal share of the score
+        images = page["images"]
+        alt_coverage = 1 - page["images_missing_alt"] / images if images else 1.0
+        seo_checks = (
+            bool(page["title"]),
+            bool(page["meta_description"]),
+            alt_coverage == 1.0,
+            page["word_count"] >= 300
+        )
+        
+        values.update(
+            page_load_time=response_time,
+            time_to_first_byte=first_byte_time,
+            seo_score=100 * sum(seo_checks) / len(seo_checks),
+            content_score=100 * min(page["word_count"] / 1000, 1.0),
+            accessibility_score=100 * alt_coverage,
+            # aiohttp verifies certificates, so a fetched https page has a valid one
+            ssl_grade="valid" if url.lower().startswith("https://") else "none"
+        )
+        return PerformanceMetrics(**values)
+
     def generate_performance_report(self, start_date: datetime, end_date: datetime) -> PerformanceReport:
         """Generate performance report for a specific period"""
         try:
-            # Filter history for the period
-            period_data = [
-                entry for entry in self.performance_history
-                if start_date <= entry["date"] <= end_date
-            ]
+            # Slice history for the period
+            dates = self._dates[:self._n]
+            lo = np.searchsorted(dates, np.datetime64(start_date), side='left')
+            hi = np.searchsorted(dates, np.datetime64(end_date), side='right')
             
-            if not period_data:
+            if lo >= hi:
                 raise ValueError("No data available for the specified period")
+            period = self._metrics_matrix[lo:hi]
             
             # Calculate changes
-            changes = self._calculate_metric_changes(period_data)
+            changes = self._calculate_metric_changes(period)
             
-            # Generate insights
-            insights = self._generate_insights(period_data)
+            # Analyze trends
+            slopes, intercepts, r_squared = self._fit_trends(lo, hi)
+            trends = self._analyze_trends(slopes, intercepts, r_squared)
             
-            # Calculate benchmarks
-            benchmarks = self._calculate_benchmarks(period_data)
+            # Generate insights, opportunities and trend action items in one pass
+            insights, opportunities, trend_actions = self._evaluate_trends(slopes, r_squared)
             
-            # Analyze trends
-            trends = self._analyze_trends(period_data)
+            # Calculate benchmarks
+            benchmarks = self._calculate_benchmarks(period)
             
             # Generate comparisons
-            comparisons = self._generate_comparisons(period_data)
+            latest = self.performance_history[hi - 1]
+            comparisons = self._generate_comparisons(latest)
             
             # Generate action items
-            action_items = self._generate_action_items(changes, insights)
+            action_items = self._generate_action_items(changes, trend_actions)
             
             # Assess risks
-            risk_assessment = self._assess_risks(period_data)
-            
-            # Identify opportunities
-            opportunities = self._identify_opportunities(period_data)
+            risk_assessment = self._assess_risks(period)
             
             # Generate competitive analysis
-            competitive_analysis = self._generate_competitive_analysis(period_data)
+            competitive_analysis = self._generate_competitive_analysis(latest)
             
             return PerformanceReport(
                 date=end_date,
-                metrics=period_data[-1]["metrics"],
+                metrics=latest,
                 changes=changes,
                 recommendations=self._generate_recommendations(changes),
                 alerts=self._generate_alerts(changes),
@@ -445,160 +673,212 @@ class SiteAdvisor:
 
     def chat(self, message: str, user_id: str = None) -> str:
         """Process user message and generate response"""
+        return self.chat_batch([message], [user_id])[0]
+
+    def chat_batch(self, messages: List[str], user_ids: Optional[List[str]] = None) -> List[str]:
+        """Process a batch of user messages and generate responses"""
+        if user_ids is None:
+            user_ids = [None] * len(messages)
         try:
-            # Classify user intent
-            intent = self._classify_intent(message)
-            
-            # Get user context
-            context = self._get_user_context(user_id)
-            
-            # Generate response based on intent
-            if intent == ChatbotIntent.MIGRATION:
-                return self._handle_migration_query(message, context)
-            elif intent == ChatbotIntent.SEO:
-                return self._handle_seo_query(message, context)
-            elif intent == ChatbotIntent.PERFORMANCE:
-                return self._handle_performance_query(message, context)
-            elif intent == ChatbotIntent.SECURITY:
-                return self._handle_security_query(message, context)
-            elif intent == ChatbotIntent.ANALYTICS:
-                return self._handle_analytics_query(message, context)
-            elif intent == ChatbotIntent.SUPPORT:
-                return self._handle_support_query(message, context)
-            elif intent == ChatbotIntent.TRAINING:
-                return self._handle_training_query(message, context)
-            elif intent == ChatbotIntent.DOCUMENTATION:
-                return self._handle_documentation_query(message, context)
-            elif intent == ChatbotIntent.TROUBLESHOOTING:
-                return self._handle_troubleshooting_query(message, context)
-            elif intent == ChatbotIntent.OPTIMIZATION:
-                return self._handle_optimization_query(message, context)
-            elif intent == ChatbotIntent.REPORTING:
-                return self._handle_reporting_query(message, context)
-            elif intent == ChatbotIntent.ALERTS:
-                return self._handle_alerts_query(message, context)
-            elif intent == ChatbotIntent.RECOMMENDATIONS:
-                return self._handle_recommendations_query(message, context)
-            elif intent == ChatbotIntent.COMPARISON:
-                return self._handle_comparison_query(message, context)
-            elif intent == ChatbotIntent.BENCHMARKING:
-                return self._handle_benchmarking_query(message, context)
-            elif intent == ChatbotIntent.FORECASTING:
-                return self._handle_forecasting_query(message, context)
-            else:
-                return "I'm not sure I understand. Could you please rephrase your question?"
+            # Classify all user intents in one batched pass
+            intents = self._classify_intents(messages)
         except Exception as e:
             self.logger.error(f"Error in chat: {str(e)}")
-            return "I'm sorry, I encountered an error. Please try again."
-
-    def _classify_intent(self, message: str) -> ChatbotIntent:
-        """Classify user intent using NLP"""
-        # Preprocess message
-        doc = self.nlp(message.lower())
+            return ["I'm sorry, I encountered an error. Please try again."] * len(messages)
+        
+        responses = []
+        for message, user_id, intent in zip(messages, user_ids, intents):
+            try:
+                # Get user context
+                context = self._get_user_context(user_id)
+                
+                # Generate response based on intent
+                responses.append(self._respond(intent, message, context))
+            except Exception as e:
+                self.logger.error(f"Error in chat: {str(e)}")
+                responses.append("I'm sorry, I encountered an error. Please try again.")
+        return responses
+
+    def _respond(self, intent: ChatbotIntent, message: str, context: Dict) -> str:
+        """Answer a message, reusing the cached response for repeated questions"""
+        normalized = _WHITESPACE_PATTERN.sub(" ", message.strip().lower())
+        key = (intent, hashlib.sha1(normalized.encode()).digest())
+        response = self._response_cache.get(key)
+        if response is not None:
+            self._response_cache.move_to_end(key)
+            return response
+        
+        handler = self._intent_handlers.get(intent, self._handle_unknown_query)
+        response = handler(message, context)
+        self._response_cache[key] = response
+        if len(self._response_cache) > self._RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+        return response
+
+    def _handle_unknown_query(self, message: str, context: Dict) -> str:
+        """Fallback response when no handler matches the intent"""
+        return "I'm not sure I understand. Could you please rephrase your question?"
+
+    def _classify_intents(self, messages: List[str]) -> List[ChatbotIntent]:
+        """Classify user intents for a batch of messages using NLP"""
+        lowered = [message.lower() for message in messages]
+        intents = [None] * len(messages)
+        
+        # Route messages whose keywords point at exactly one intent
+        pending = []
+        for idx, text in enumerate(lowered):
+            matched = {_KEYWORD_INTENTS[keyword] for keyword in _INTENT_KEYWORD_PATTERN.findall(text)}
+            if len(matched) == 1:
+                intents[idx] = matched.pop()
+            else:
+                pending.append(idx)
+        if not pending:
+            return intents
+        
+        # Preprocess the remaining messages in a single spaCy pass
+        docs = self.nlp.pipe([lowered[idx] for idx in pending], batch_size=64)
         
         # Extract features
-        tokens = [token.lemma_ for token in doc if not token.is_stop]
+        token_lists = [[token.lemma_ for token in doc if not token.is_stop] for doc in docs]
         
-        # Classify intent
-        intent_scores = self.intent_classifier.predict([tokens])[0]
-        max_score_idx = np.argmax(intent_scores)
+        # Classify intents
+        intent_scores = np.asarray(self.intent_classifier.predict(token_lists))
+        all_intents = list(ChatbotIntent)
+        for idx, score_idx in zip(pending, np.argmax(intent_scores, axis=1)):
+            intents[idx] = all_intents[score_idx]
         
-        return list(ChatbotIntent)[max_score_idx]
+        return intents
 
     def _get_user_context(self, user_id: str) -> Dict:
         """Get user context for personalized responses"""
-        if user_id not in self.user_profiles:
-            self.user_profiles[user_id] = {
-                "role": "user",
-                "preferences": {},
-                "history": [],
-                "expertise_level": "beginner"
-            }
         return self.user_profiles[user_id]
 
-    def _update_analytics_data(self, metrics: PerformanceMetrics):
-        """Update analytics data with new metrics"""
-        for field in metrics.__dict__:
-            if isinstance(getattr(metrics, field), (int, float)):
-                self.analytics_data[field].append(getattr(metrics, field))
+    def _update_analytics_data(self, metrics: PerformanceMetrics, recorded_at: datetime):
+        """Append metrics to history and update running analytics sums"""
+        if self._n == len(self._dates):
+            capacity = 2 * len(self._dates)
+            self._metrics_matrix = np.resize(self._metrics_matrix, (capacity, len(NUMERIC_FIELDS)))
+            self._dates = np.resize(self._dates, capacity)
+            for name in self._PREFIX_SUMS:
+                setattr(self, name, np.resize(getattr(self, name), (capacity + 1, len(NUMERIC_FIELDS))))
+        n = self._n
+        # None (unobserved) becomes NaN in the matrix and is left out of the sums
+        values = np.array(_GET_NUMERIC(metrics), dtype=float)
+        self._metrics_matrix[n] = values
+        self._dates[n] = np.datetime64(recorded_at, 'us')
+        observed = ~np.isnan(values)
+        first = observed & np.isnan(self._y_shift)
+        self._y_shift[first] = values[first]
+        shifted = np.where(observed, values - self._y_shift, 0.0)
+        self._cum_n[n + 1] = self._cum_n[n] + observed
+        self._cum_x[n + 1] = self._cum_x[n] + n * observed
+        self._cum_xx[n + 1] = self._cum_xx[n] + n * n * observed
+        _compensated_append(self._cum_y, self._cum_y_err, n, shifted)
+        _compensated_append(self._cum_xy, self._cum_xy_err, n, n * shifted)
+        _compensated_append(self._cum_yy, self._cum_yy_err, n, shifted * shifted)
+        self._n = n + 1
+        self.performance_history.append(metrics)
 
     def _check_for_anomalies(self, metrics: PerformanceMetrics):
         """Check for anomalies in metrics"""
-        for field in metrics.__dict__:
-            if isinstance(getattr(metrics, field), (int, float)):
-                values = self.analytics_data[field]
-                if len(values) > 1:
-                    mean = statistics.mean(values[:-1])
-                    std = statistics.stdev(values[:-1])
-                    current = getattr(metrics, field)
-                    if abs(current - mean) > 3 * std:
-                        self.logger.warning(f"Anomaly detected in {field}: {current}")
-
-    def _generate_insights(self, period_data: List[Dict]) -> List[str]:
-        """Generate insights from performance data"""
-        insights = []
-        
-        # Calculate trends
-        trends = self._analyze_trends(period_data)
-        
-        # Generate insights based on trends
-        for metric, trend in trends.items():
-            if trend["slope"] > 0.1:
-                insights.append(f"Strong positive trend in {metric}")
-            elif trend["slope"] < -0.1:
-                insights.append(f"Concerning negative trend in {metric}")
-        
-        return insights
-
-    def _calculate_benchmarks(self, period_data: List[Dict]) -> Dict[str, float]:
+        n = self._n
+        if n < 2:
+            return
+        # Each metric is compared with the samples where it was observed;
+        # metrics with fewer than two samples, or missing now, are skipped
+        current = np.array(_GET_NUMERIC(metrics), dtype=float)
+        count = self._cum_n[n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Mean and sample variance (matching statistics.stdev) of the shifted values
+            mean = self._window_sum(self._cum_y, self._cum_y_err, 0, n) / count
+            sum_yy = self._window_sum(self._cum_yy, self._cum_yy_err, 0, n)
+            std = np.sqrt(np.maximum((sum_yy - count * mean * mean) / (count - 1), 0.0))
+        for idx in np.flatnonzero((count >= 2) & (np.abs(current - self._y_shift - mean) > 3 * std)):
+            self.logger.warning(f"Anomaly detected in {NUMERIC_FIELDS[idx]}: {current[idx]}")
+
+    def _calculate_benchmarks(self, period: np.ndarray) -> Dict[str, float]:
         """Calculate benchmarks from performance data"""
         benchmarks = {}
         
-        for metric in period_data[0]["metrics"].__dict__:
-            values = [entry["metrics"].__dict__[metric] for entry in period_data]
-            if isinstance(values[0], (int, float)):
-                benchmarks[metric] = {
-                    "mean": statistics.mean(values),
-                    "median": statistics.median(values),
-                    "std": statistics.stdev(values) if len(values) > 1 else 0
-                }
+        stats = _benchmark_kernel(period)
+        for metric, (mean, median, std) in zip(NUMERIC_FIELDS, stats.tolist()):
+            benchmarks[metric] = {"mean": mean, "median": median, "std": std}
         
         return benchmarks
 
-    def _analyze_trends(self, period_data: List[Dict]) -> Dict[str, Dict[str, float]]:
+    def _fit_trends(self, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Fit linear trends for history rows lo..hi-1, returning slopes, intercepts and r-squared"""
+        # Closed-form least squares from the prefix sums, O(F) for any window,
+        # over the rows where each metric was observed. x is taken relative to
+        # the window start, exactly in integers, and y relative to its shift
+        t = self._cum_n[hi] - self._cum_n[lo]
+        window_x = self._cum_x[hi] - self._cum_x[lo]
+        sum_x = (window_x - lo * t).astype(np.float64)
+        sum_xx = ((self._cum_xx[hi] - self._cum_xx[lo]) - 2 * lo * window_x + lo * lo * t).astype(np.float64)
+        sum_y = self._window_sum(self._cum_y, self._cum_y_err, lo, hi)
+        sum_xy = self._window_sum(self._cum_xy, self._cum_xy_err, lo, hi) - lo * sum_y
+        sum_yy = self._window_sum(self._cum_yy, self._cum_yy_err, lo, hi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sxx = sum_xx - sum_x * sum_x / t
+            sxy = sum_xy - sum_x * sum_y / t
+            syy = sum_yy - sum_y * sum_y / t
+            slopes = sxy / sxx
+            r_squared = sxy ** 2 / (sxx * syy)
+            # Intercept at the start of the window, as if x ran from 0
+            intercepts = self._y_shift + sum_y / t - slopes * sum_x / t
+        return slopes, intercepts, r_squared
+
+    @staticmethod
+    def _window_sum(total: np.ndarray, err: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        """Sum of history rows lo..hi-1 from a compensated prefix sum"""
+        return (total[hi] - total[lo]) + (err[hi] - err[lo])
+
+    def _analyze_trends(self, slopes: np.ndarray, intercepts: np.ndarray,
+                        r_squared: np.ndarray) -> Dict[str, Dict[str, float]]:
         """Analyze trends in performance data"""
-        trends = {}
-        
-        for metric in period_data[0]["metrics"].__dict__:
-            values = [entry["metrics"].__dict__[metric] for entry in period_data]
-            if isinstance(values[0], (int, float)):
-                x = np.arange(len(values))
-                slope, intercept = np.polyfit(x, values, 1)
-                trends[metric] = {
-                    "slope": slope,
-                    "intercept": intercept,
-                    "r_squared": np.corrcoef(x, values)[0, 1] ** 2
-                }
-        
-        return trends
+        return {
+            metric: {"slope": slope, "intercept": intercept, "r_squared": r2}
+            for metric, slope, intercept, r2 in zip(
+                NUMERIC_FIELDS, slopes.tolist(), intercepts.tolist(), r_squared.tolist()
+            )
+        }
 
-    def _generate_comparisons(self, period_data: List[Dict]) -> Dict[str, Dict[str, float]]:
-        """Generate comparisons with industry benchmarks"""
-        comparisons = {}
-        
-        for metric in period_data[0]["metrics"].__dict__:
-            current_value = period_data[-1]["metrics"].__dict__[metric]
-            if isinstance(current_value, (int, float)):
-                comparisons[metric] = {
-                    "current": current_value,
-                    "industry_average": self.benchmarks.get(metric, {}).get("average", 0),
-                    "difference": current_value - self.benchmarks.get(metric, {}).get("average", 0)
-                }
+    def _evaluate_trends(self, slopes: np.ndarray,
+                         r_squared: np.ndarray) -> Tuple[List[str], List[str], List[str]]:
+        """Derive insights, opportunities and trend action items from fitted trends"""
+        rising = slopes > 0.1
+        moving = np.flatnonzero(rising | (slopes < -0.1))
+        strong = moving[r_squared[moving] > 0.7]
         
-        return comparisons
+        insights = [
+            f"Strong positive trend in {NUMERIC_FIELDS[idx]}" if rising[idx]
+            else f"Concerning negative trend in {NUMERIC_FIELDS[idx]}"
+            for idx in moving
+        ]
+        action_items = [
+            f"Maintain and enhance {insight}" if rising[idx]
+            else f"Develop strategy to reverse {insight}"
+            for idx, insight in zip(moving, insights)
+        ]
+        opportunities = [
+            f"Growing strength in {NUMERIC_FIELDS[idx]}" if rising[idx]
+            else f"Potential to improve {NUMERIC_FIELDS[idx]}"
+            for idx in strong
+        ]
+        return insights, opportunities, action_items
+
+    def _generate_comparisons(self, latest: PerformanceMetrics) -> Dict[str, Dict[str, float]]:
+        """Generate comparisons with industry benchmarks"""
+        # Current values come from the recorded metrics, not the float32
+        # matrix, so they are reported exactly; unobserved metrics are skipped
+        return {
+            metric: {"current": value, "industry_average": average, "difference": value - average}
+            for metric, value, average in zip(NUMERIC_FIELDS, _GET_NUMERIC(latest), self._benchmark_vec.tolist())
+            if value is not None
+        }
 
-    def _generate_action_items(self, changes: Dict[str, float], insights: List[str]) -> List[str]:
-        """Generate action items based on changes and insights"""
+    def _generate_action_items(self, changes: Dict[str, float], trend_actions: List[str]) -> List[str]:
+        """Generate action items based on changes and trend actions"""
         action_items = []
         
         # Add action items based on significant changes
@@ -608,73 +888,56 @@ class SiteAdvisor:
             elif change > 20:
                 action_items.append(f"Capitalize on {metric} improvement")
         
-        # Add action items based on insights
-        for insight in insights:
-            if "negative trend" in insight:
-                action_items.append(f"Develop strategy to reverse {insight}")
-            elif "positive trend" in insight:
-                action_items.append(f"Maintain and enhance {insight}")
+        # Add action items based on trends
+        action_items.extend(trend_actions)
         
         return action_items
 
-    def _assess_risks(self, period_data: List[Dict]) -> Dict[str, float]:
+    def _assess_risks(self, period: np.ndarray) -> Dict[str, float]:
         """Assess risks based on performance data"""
         risks = {}
         
         # Calculate risk scores for different aspects
-        risks["traffic_risk"] = self._calculate_traffic_risk(period_data)
-        risks["conversion_risk"] = self._calculate_conversion_risk(period_data)
-        risks["technical_risk"] = self._calculate_technical_risk(period_data)
-        risks["security_risk"] = self._calculate_security_risk(period_data)
+        risks["traffic_risk"] = self._calculate_traffic_risk(period)
+        risks["conversion_risk"] = self._calculate_conversion_risk(period)
+        risks["technical_risk"] = self._calculate_technical_risk(period)
+        risks["security_risk"] = self._calculate_security_risk(period)
         
         return risks
 
-    def _identify_opportunities(self, period_data: List[Dict]) -> List[str]:
-        """Identify opportunities based on performance data"""
-        opportunities = []
-        
-        # Analyze trends for opportunities
-        trends = self._analyze_trends(period_data)
-        
-        for metric, trend in trends.items():
-            if trend["slope"] > 0.1 and trend["r_squared"] > 0.7:
-                opportunities.append(f"Growing strength in {metric}")
-            elif trend["slope"] < -0.1 and trend["r_squared"] > 0.7:
-                opportunities.append(f"Potential to improve {metric}")
-        
-        return opportunities
-
-    def _generate_competitive_analysis(self, period_data: List[Dict]) -> Dict[str, Dict[str, float]]:
+    def _generate_competitive_analysis(self, latest: PerformanceMetrics) -> Dict[str, Dict[str, float]]:
         """Generate competitive analysis"""
         analysis = {}
         
+        current = [
+            (metric, value) for metric, value in zip(NUMERIC_FIELDS, _GET_NUMERIC(latest)) if value is not None
+        ]
         for competitor in self.competitors:
             analysis[competitor] = {}
-            for metric in period_data[0]["metrics"].__dict__:
-                if isinstance(getattr(period_data[-1]["metrics"], metric), (int, float)):
-                    analysis[competitor][metric] = {
-                        "value": self.competitors[competitor].get(metric, 0),
-                        "difference": getattr(period_data[-1]["metrics"], metric) - self.competitors[competitor].get(metric, 0)
-                    }
+            for metric, current_value in current:
+                analysis[competitor][metric] = {
+                    "value": self.competitors[competitor].get(metric, 0),
+                    "difference": current_value - self.competitors[competitor].get(metric, 0)
+                }
         
         return analysis
 
-    def _calculate_traffic_risk(self, period_data: List[Dict]) -> float:
+    def _calculate_traffic_risk(self, period: np.ndarray) -> float:
         """Calculate traffic-related risk score"""
         # Implement traffic risk calculation
         return 0.0
 
-    def _calculate_conversion_risk(self, period_data: List[Dict]) -> float:
+    def _calculate_conversion_risk(self, period: np.ndarray) -> float:
         """Calculate conversion-related risk score"""
         # Implement conversion risk calculation
         return 0.0
 
-    def _calculate_technical_risk(self, period_data: List[Dict]) -> float:
+    def _calculate_technical_risk(self, period: np.ndarray) -> float:
         """Calculate technical risk score"""
         # Implement technical risk calculation
         return 0.0
 
-    def _calculate_security_risk(self, period_data: List[Dict]) -> float:
+    def _calculate_security_risk(self, period: np.ndarray) -> float:
         """Calculate security risk score"""
         # Implement security risk calculation
         return 0.0
@@ -2,7 +2,6 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 import xgboost as xgb
 from datetime import datetime, timedelta
@@ -37,13 +36,16 @@ class ValuationScenario:
     probability: float
 
 class ValuationAnalyzer:
+    _COMPARABLE_METRICS = ["revenue", "growth_rate", "gross_margin", "ebitda_margin"]
+
     def __init__(self, data_dir: str = "data/market_transactions"):
         """Initialize the Valuation Analyzer with historical transaction data."""
         self.data_dir = Path(data_dir)
         self.logger = self._setup_logging()
         self.transaction_data = self._load_transaction_data()
-        self.ml_model = self._train_valuation_model()
+        self._index_comparables()
         self.scaler = StandardScaler()
+        self.ml_model = self._train_valuation_model()
 
     def _setup_logging(self) -> logging.Logger:
         """Set up logging configuration."""
@@ -74,7 +76,17 @@ class ValuationAnalyzer:
         
         return df
 
-    def _train_valuation_model(self) -> RandomForestRegressor:
+    def _index_comparables(self) -> None:
+        """Precompute the normalized metric matrix used to find comparable transactions."""
+        metrics = self.transaction_data[self._COMPARABLE_METRICS]
+        self._comp_mean = metrics.mean().to_numpy(dtype=np.float32)
+        self._comp_std = metrics.std().to_numpy(dtype=np.float32)
+        self._comp_norm = (metrics.to_numpy(dtype=np.float32) - self._comp_mean) / self._comp_std
+        self._comp_records = self.transaction_data[
+            ["company_name", "date", "valuation", "revenue_multiple", "growth_rate"]
+        ].to_dict("records")
+
+    def _train_valuation_model(self) -> xgb.XGBRegressor:
         """Train ML model for valuation predictions."""
         # Prepare features
         feature_columns = [
@@ -85,13 +97,14 @@ class ValuationAnalyzer:
         X = self.transaction_data[feature_columns].fillna(0)
         y = self.transaction_data["valuation"]
         
-        # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+        # Scale features; fitted on a plain array since predictions pass arrays
+        X_scaled = self.scaler.fit_transform(X.to_numpy())
         
         # Train model
-        model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
+        model = xgb.XGBRegressor(
+            tree_method="hist",
+            n_estimators=200,
+            max_depth=8,
             random_state=42
         )
         model.fit(X_scaled, y)
@@ -100,11 +113,9 @@ class ValuationAnalyzer:
 
     def analyze_company(self, metrics: CompanyMetrics) -> Dict[str, Any]:
         """Perform comprehensive valuation analysis for a company."""
-        # Calculate base valuation
-        base_valuation = self._predict_valuation(metrics)
-        
-        # Generate scenarios
-        scenarios = self._generate_scenarios(metrics, base_valuation)
+        # Generate scenarios; the base case carries the base valuation
+        scenarios = self._generate_scenarios(metrics)
+        base_valuation = scenarios[-1].valuation
         
         # Calculate multiples
         multiples = self._calculate_multiples(metrics, base_valuation)
@@ -131,28 +142,34 @@ class ValuationAnalyzer:
 
     def _predict_valuation(self, metrics: CompanyMetrics) -> float:
         """Predict company valuation using the ML model."""
-        # Prepare features
-        features = pd.DataFrame([{
-            "revenue": metrics.revenue,
-            "growth_rate": metrics.growth_rate,
-            "gross_margin": metrics.gross_margin,
-            "ebitda_margin": metrics.ebitda_margin,
-            "arr": metrics.arr or 0,
-            "mrr": metrics.mrr or 0,
-            "cac": metrics.cac or 0,
-            "ltv": metrics.ltv or 0,
-            "churn_rate": metrics.churn_rate or 0,
-            "traffic": metrics.traffic or 0,
-            "conversion_rate": metrics.conversion_rate or 0
-        }])
+        return float(self._predict_valuations([metrics])[0])
+
+    def _predict_valuations(self, metrics_list: List[CompanyMetrics]) -> np.ndarray:
+        """Predict valuations for several companies with a single model call."""
+        # Prepare features in training column order
+        features = np.empty((len(metrics_list), 11), dtype=np.float32)
+        for i, metrics in enumerate(metrics_list):
+            features[i] = (
+                metrics.revenue,
+                metrics.growth_rate,
+                metrics.gross_margin,
+                metrics.ebitda_margin,
+                metrics.arr or 0,
+                metrics.mrr or 0,
+                metrics.cac or 0,
+                metrics.ltv or 0,
+                metrics.churn_rate or 0,
+                metrics.traffic or 0,
+                metrics.conversion_rate or 0
+            )
         
         # Scale features
         features_scaled = self.scaler.transform(features)
         
-        # Predict valuation
-        return float(self.ml_model.predict(features_scaled)[0])
+        # Predict valuations
+        return self.ml_model.predict(features_scaled)
 
-    def _generate_scenarios(self, base_metrics: CompanyMetrics, base_valuation: float) -> List[ValuationScenario]:
+    def _generate_scenarios(self, base_metrics: CompanyMetrics) -> List[ValuationScenario]:
         """Generate different valuation scenarios."""
         scenarios = []
         
@@ -171,20 +188,6 @@ class ValuationAnalyzer:
             conversion_rate=base_metrics.conversion_rate * 1.2 if base_metrics.conversion_rate else None
         )
         
-        scenarios.append(ValuationScenario(
-            name="Optimistic Growth",
-            description="Accelerated growth with improved margins",
-            adjusted_metrics=optimistic_metrics,
-            valuation=self._predict_valuation(optimistic_metrics),
-            multiple=self._calculate_primary_multiple(optimistic_metrics),
-            key_drivers=[
-                {"factor": "Growth Rate", "change": "+50%"},
-                {"factor": "Margins", "change": "+10-20%"},
-                {"factor": "Efficiency", "change": "+20%"}
-            ],
-            probability=0.25
-        ))
-        
         # Conservative scenario
         conservative_metrics = CompanyMetrics(
             revenue=base_metrics.revenue * 0.9,
@@ -200,12 +203,31 @@ class ValuationAnalyzer:
             conversion_rate=base_metrics.conversion_rate * 0.9 if base_metrics.conversion_rate else None
         )
         
+        # Value every scenario in one model call
+        optimistic_valuation, conservative_valuation, base_valuation = (
+            float(v) for v in self._predict_valuations([optimistic_metrics, conservative_metrics, base_metrics])
+        )
+        
+        scenarios.append(ValuationScenario(
+            name="Optimistic Growth",
+            description="Accelerated growth with improved margins",
+            adjusted_metrics=optimistic_metrics,
+            valuation=optimistic_valuation,
+            multiple=self._calculate_primary_multiple(optimistic_metrics, optimistic_valuation),
+            key_drivers=[
+                {"factor": "Growth Rate", "change": "+50%"},
+                {"factor": "Margins", "change": "+10-20%"},
+                {"factor": "Efficiency", "change": "+20%"}
+            ],
+            probability=0.25
+        ))
+        
         scenarios.append(ValuationScenario(
             name="Conservative",
             description="Slower growth with compressed margins",
             adjusted_metrics=conservative_metrics,
-            valuation=self._predict_valuation(conservative_metrics),
-            multiple=self._calculate_primary_multiple(conservative_metrics),
+            valuation=conservative_valuation,
+            multiple=self._calculate_primary_multiple(conservative_metrics, conservative_valuation),
             key_drivers=[
                 {"factor": "Growth Rate", "change": "-30%"},
                 {"factor": "Margins", "change": "-5-20%"},
@@ -220,7 +242,7 @@ class ValuationAnalyzer:
             description="Current trajectory maintained",
             adjusted_metrics=base_metrics,
             valuation=base_valuation,
-            multiple=self._calculate_primary_multiple(base_metrics),
+            multiple=self._calculate_primary_multiple(base_metrics, base_valuation),
             key_drivers=[
                 {"factor": "Current Metrics", "change": "Maintained"}
             ],
@@ -238,45 +260,45 @@ class ValuationAnalyzer:
             "ltv_cac_ratio": metrics.ltv / metrics.cac if metrics.ltv and metrics.cac else None
         }
 
-    def _calculate_primary_multiple(self, metrics: CompanyMetrics) -> float:
+    def _calculate_primary_multiple(self, metrics: CompanyMetrics, valuation: float) -> float:
         """Calculate the primary valuation multiple based on available metrics."""
         if metrics.arr:
-            return self._predict_valuation(metrics) / metrics.arr
-        return self._predict_valuation(metrics) / metrics.revenue
+            return valuation / metrics.arr
+        return valuation / metrics.revenue
 
     def _find_comparable_transactions(self, metrics: CompanyMetrics) -> List[Dict[str, Any]]:
         """Find similar companies and their transaction details."""
-        # Calculate similarity scores
-        df = self.transaction_data.copy()
-        
-        # Normalize metrics for comparison
-        metric_columns = ["revenue", "growth_rate", "gross_margin", "ebitda_margin"]
-        df_normalized = (df[metric_columns] - df[metric_columns].mean()) / df[metric_columns].std()
-        
-        company_metrics = pd.DataFrame([{
-            "revenue": metrics.revenue,
-            "growth_rate": metrics.growth_rate,
-            "gross_margin": metrics.gross_margin,
-            "ebitda_margin": metrics.ebitda_margin
-        }])
-        company_normalized = (company_metrics - df[metric_columns].mean()) / df[metric_columns].std()
-        
-        # Calculate Euclidean distance
-        distances = np.sqrt(((df_normalized - company_normalized.iloc[0]) ** 2).sum(axis=1))
-        
-        # Get top 5 most similar companies
-        similar_indices = distances.nsmallest(5).index
+        # Normalize the company's metrics against the precomputed statistics
+        company_normalized = (np.array([
+            metrics.revenue,
+            metrics.growth_rate,
+            metrics.gross_margin,
+            metrics.ebitda_margin
+        ], dtype=np.float32) - self._comp_mean) / self._comp_std
+        
+        # Squared Euclidean distance ranks the same as the distance itself;
+        # missing metrics contribute nothing
+        diff = np.nan_to_num(self._comp_norm - company_normalized)
+        squared_distances = np.einsum("ij,ij->i", diff, diff)
+        
+        # Get top 5 most similar companies without sorting every transaction
+        k = min(5, len(squared_distances))
+        if k == 0:
+            return []
+        similar_indices = np.argpartition(squared_distances, k - 1)[:k]
+        similar_indices = similar_indices[np.argsort(squared_distances[similar_indices], kind="stable")]
+        max_distance = np.sqrt(squared_distances.max())
         comparables = []
         
         for idx in similar_indices:
-            transaction = self.transaction_data.iloc[idx]
+            transaction = self._comp_records[idx]
             comparables.append({
                 "company_name": transaction["company_name"],
                 "transaction_date": transaction["date"],
                 "valuation": transaction["valuation"],
                 "revenue_multiple": transaction["revenue_multiple"],
                 "growth_rate": transaction["growth_rate"],
-                "similarity_score": 1 - (distances[idx] / distances.max())
+                "similarity_score": 1 - (np.sqrt(squared_distances[idx]) / max_distance)
             })
         
         return comparables
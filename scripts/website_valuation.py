@@ -5,28 +5,148 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 import joblib
 import json
+import copy
+import hashlib
+import operator
 from datetime import datetime
+from collections import OrderedDict
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List, Tuple, Optional
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import IsolationForest
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import dash_bootstrap_components as dbc
 from sklearn.neighbors import LocalOutlierFactor
 
+# Plotting and dashboard libraries are imported where they are used
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 class WebsiteValuationAI:
+    _PREPROCESS_CACHE_SIZE = 4
+    
+    # Model inputs, in training column order
+    _MODEL_FEATURES = (
+        'monthly_visitors', 'page_views', 'traffic_quality',
+        'seo_strength', 'content_quality', 'user_engagement',
+        'technical_performance', 'conversion_potential',
+        'competition_score'
+    )
+    
+    # (column, comparison, threshold, recommendation) in report order
+    _RECOMMENDATION_RULES = (
+        # Traffic recommendations
+        ('monthly_visitors', operator.lt, 1000, {
+            'category': 'traffic',
+            'priority': 'high',
+            'action': 'Implement comprehensive marketing strategy',
+            'expected_impact': '20-30% increase in monthly visitors',
+            'timeframe': '3-6 months',
+            'estimated_cost': '$5,000-$10,000',
+            'metrics_affected': ['monthly_visitors', 'page_views', 'conversion_rate'],
+            'roi_estimate': '200-300%',
+            'implementation_steps': [
+                'Develop content marketing strategy',
+                'Implement SEO best practices',
+                'Launch paid advertising campaigns',
+                'Optimize social media presence'
+            ]
+        }),
+        # SEO recommendations
+        ('domain_authority', operator.lt, 30, {
+            'category': 'seo',
+            'priority': 'medium',
+            'action': 'Develop backlink acquisition strategy',
+            'expected_impact': '5-10 point increase in domain authority',
+            'timeframe': '6-12 months',
+            'estimated_cost': '$3,000-$6,000',
+            'metrics_affected': ['domain_authority', 'backlinks', 'organic_keywords'],
+            'roi_estimate': '150-250%',
+            'implementation_steps': [
+                'Conduct competitor backlink analysis',
+                'Create high-quality content for link building',
+                'Build relationships with industry influencers',
+                'Implement technical SEO improvements'
+            ]
+        }),
+        # Technical recommendations
+        ('page_load_time', operator.gt, 3, {
+            'category': 'technical',
+            'priority': 'high',
+            'action': 'Optimize website performance',
+            'expected_impact': '50% reduction in page load time',
+            'timeframe': '1-2 months',
+            'estimated_cost': '$2,000-$4,000',
+            'metrics_affected': ['page_load_time', 'bounce_rate', 'conversion_rate'],
+            'roi_estimate': '300-400%',
+            'implementation_steps': [
+                'Optimize image sizes and formats',
+                'Implement browser caching',
+                'Minify CSS and JavaScript',
+                'Upgrade hosting infrastructure'
+            ]
+        }),
+        # Content recommendations
+        ('content_freshness', operator.lt, 50, {
+            'category': 'content',
+            'priority': 'medium',
+            'action': 'Update and expand content strategy',
+            'expected_impact': 'Improved user engagement and SEO',
+            'timeframe': '3-6 months',
+            'estimated_cost': '$4,000-$8,000',
+            'metrics_affected': ['content_freshness', 'avg_time_on_site', 'social_shares'],
+            'roi_estimate': '180-280%',
+            'implementation_steps': [
+                'Audit existing content',
+                'Develop content calendar',
+                'Create pillar content pieces',
+                'Implement content distribution strategy'
+            ]
+        }),
+        # User engagement recommendations
+        ('email_subscribers', operator.lt, 1000, {
+            'category': 'engagement',
+            'priority': 'medium',
+            'action': 'Implement email marketing strategy',
+            'expected_impact': '500-1000 new subscribers',
+            'timeframe': '3-6 months',
+            'estimated_cost': '$2,000-$5,000',
+            'metrics_affected': ['email_subscribers', 'conversion_rate', 'returning_visitors'],
+            'roi_estimate': '250-350%',
+            'implementation_steps': [
+                'Create lead magnets',
+                'Implement email automation',
+                'Design email templates',
+                'Develop segmentation strategy'
+            ]
+        }),
+        # Mobile optimization recommendations
+        ('mobile_traffic', operator.lt, 30, {
+            'category': 'mobile',
+            'priority': 'high',
+            'action': 'Optimize for mobile experience',
+            'expected_impact': '20-30% increase in mobile traffic',
+            'timeframe': '2-4 months',
+            'estimated_cost': '$3,000-$6,000',
+            'metrics_affected': ['mobile_traffic', 'bounce_rate', 'conversion_rate'],
+            'roi_estimate': '220-320%',
+            'implementation_steps': [
+                'Implement responsive design',
+                'Optimize mobile navigation',
+                'Improve mobile page speed',
+                'Enhance mobile forms and CTAs'
+            ]
+        }),
+    )
+
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
+        # Training-set imputation values, reused for predictions
+        self.fill_values = {}
+        # Recent preprocess_data results keyed by frame fingerprint
+        self._preprocess_cache = OrderedDict()
         self.feature_importance = {}
         self.nlp_model = None
         self.bot_detector = None
@@ -69,13 +189,59 @@ class WebsiteValuationAI:
         """Preprocess the data for model training"""
         print("Preprocessing data...")
         
+        # Identical frames preprocess identically, so reuse the features and
+        # the imputation values and scaler fitted on them; df itself is never
+        # modified, whether or not the result comes from the cache
+        cache_key = (
+            df.shape,
+            tuple(df.columns),
+            hashlib.blake2b(pd.util.hash_pandas_object(df).to_numpy().tobytes(), digest_size=16).digest()
+        )
+        cached = self._preprocess_cache.get(cache_key)
+        if cached is not None:
+            self._preprocess_cache.move_to_end(cache_key)
+            X_scaled, y, features, fill_values, scaler = cached
+            self.fill_values = dict(fill_values)
+            self.scaler = copy.deepcopy(scaler)
+            return X_scaled.copy(), None if y is None else y.copy(), list(features)
+        
+        X_scaled, y, features = self._preprocess_impl(df)
+        self._preprocess_cache[cache_key] = (
+            X_scaled.copy(), y, list(features), dict(self.fill_values), copy.deepcopy(self.scaler)
+        )
+        if len(self._preprocess_cache) > self._PREPROCESS_CACHE_SIZE:
+            self._preprocess_cache.popitem(last=False)
+        return X_scaled, None if y is None else y.copy(), features
+    
+    def _preprocess_impl(self, df: pd.DataFrame) -> Tuple[np.ndarray, Optional[np.ndarray], List[str]]:
+        """Fill, engineer, select and scale features, fitting imputation and the scaler on df"""
+        # Work on a copy so the caller's frame looks the same after a cache hit or miss
+        df = df.copy()
+        
         # Handle missing values with advanced imputation
+        self.fill_values = {}
         for col in df.columns:
             if df[col].dtype in ['int64', 'float64']:
-                df[col] = df[col].fillna(df[col].median())
+                self.fill_values[col] = df[col].median()
             else:
-                df[col] = df[col].fillna(df[col].mode()[0])
+                self.fill_values[col] = df[col].mode()[0]
+            df[col] = df[col].fillna(self.fill_values[col])
         
+        X = self._engineer_features(df)
+        y = df['actual_value'].to_numpy() if 'actual_value' in df.columns else None
+        
+        # Scale features
+        X_scaled = self.scaler.fit_transform(X)
+        
+        return X_scaled, y, list(self._MODEL_FEATURES)
+    
+    def _transform_features(self, df: pd.DataFrame) -> np.ndarray:
+        """Fill, engineer and scale prediction inputs with the training-fitted transforms"""
+        df = df.fillna({col: value for col, value in self.fill_values.items() if col in df.columns})
+        return self.scaler.transform(self._engineer_features(df))
+    
+    def _engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add derived features to df in place and return the model inputs"""
         # Enhanced feature engineering
         df['traffic_quality'] = (
             df['avg_time_on_site'] * (1 - df['bounce_rate']/100) *
@@ -113,29 +279,22 @@ class WebsiteValuationAI:
             (df['mobile_traffic']/100) * (1 - df['bounce_rate']/100)
         )
         
-        # Select features for training
-        features = [
-            'monthly_visitors', 'page_views', 'traffic_quality',
-            'seo_strength', 'content_quality', 'user_engagement',
-            'technical_performance', 'conversion_potential',
-            'competition_score'
-        ]
-        
-        X = df[features]
-        y = df['actual_value'] if 'actual_value' in df.columns else None
-        
-        # Scale features
-        X_scaled = self.scaler.fit_transform(X)
-        
-        return X_scaled, y, features
+        # Select features for the model
+        return df[list(self._MODEL_FEATURES)]
     
     def train_model(self, X: np.ndarray, y: np.ndarray) -> None:
         """Train the AI model"""
         print("Training AI model...")
         
-        # Split data with stratification
+        # Split data with stratification on value quintiles; datasets too
+        # small to place every quintile in both splits are split at random
+        strata = pd.qcut(y, q=5, labels=False, duplicates='drop')
+        n_strata = strata.max() + 1
+        n_test = int(np.ceil(0.2 * len(y)))
+        if np.bincount(strata).min() < 2 or min(n_test, len(y) - n_test) < n_strata:
+            strata = None
         X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=pd.qcut(y, q=5)
+            X, y, test_size=0.2, random_state=42, stratify=strata
         )
         
         # Initialize and train model with hyperparameter tuning
@@ -151,7 +310,7 @@ class WebsiteValuationAI:
         
         # Calculate feature importance
         self.feature_importance = dict(zip(
-            features,
+            self._MODEL_FEATURES,
             self.model.feature_importances_
         ))
         
@@ -398,38 +557,67 @@ class WebsiteValuationAI:
     
     def predict_value(self, website_data: Dict) -> Dict:
         """Predict website value"""
+        return self.predict_values_batch([website_data])[0]
+    
+    def predict_values_batch(self, websites: List[Dict]) -> List[Dict]:
+        """Predict the value of several websites with one model call"""
         print("Predicting website value...")
         
-        # Preprocess input data
-        X = self.preprocess_data(pd.DataFrame([website_data]))[0]
+        # Transform all inputs into a single feature matrix with the
+        # imputation and scaling fitted at training time, so each website is
+        # valued independently of the rest of the batch
+        websites_df = pd.DataFrame(websites)
+        X = self._transform_features(websites_df)
         
-        # Make prediction with confidence intervals
-        predicted_value = self.model.predict(X)[0]
-        predictions = np.array([tree.predict(X)[0] for tree in self.model.estimators_])
-        std_dev = np.std(predictions)
-        confidence_interval = (predicted_value - 1.96*std_dev, predicted_value + 1.96*std_dev)
+        # Make predictions with confidence intervals; per-tree predictions
+        # are stacked as (n_trees, n_websites)
+        predicted_values = self.model.predict(X)
+        tree_predictions = np.stack([tree.predict(X) for tree in self.model.estimators_])
+        std_devs = tree_predictions.std(axis=0)
         
-        # Calculate confidence score
-        confidence = self._calculate_confidence(website_data)
+        # Calculate confidence scores
+        confidences = self._calculate_confidence_batch(websites_df, self._key_mask(websites, websites_df.columns))
         
         # Generate recommendations
-        recommendations = self._generate_recommendations(website_data)
-        
-        # Calculate comparative analysis
-        comparative_analysis = self._calculate_comparative_analysis(website_data, predicted_value)
-        
-        return {
-            'predicted_value': round(predicted_value, 2),
-            'confidence_interval': tuple(round(x, 2) for x in confidence_interval),
-            'confidence': round(confidence, 2),
-            'feature_importance': self.feature_importance,
-            'recommendations': recommendations,
-            'comparative_analysis': comparative_analysis,
-            'timestamp': datetime.now().isoformat()
-        }
+        all_recommendations = self._generate_recommendations_batch(websites_df)
+        
+        results = []
+        for website_data, predicted_value, std_dev, confidence, recommendations in zip(
+                websites, predicted_values, std_devs, confidences, all_recommendations):
+            confidence_interval = (predicted_value - 1.96*std_dev, predicted_value + 1.96*std_dev)
+            
+            # Calculate comparative analysis
+            comparative_analysis = self._calculate_comparative_analysis(website_data, predicted_value)
+            
+            results.append({
+                'predicted_value': round(predicted_value, 2),
+                'confidence_interval': tuple(round(x, 2) for x in confidence_interval),
+                'confidence': round(float(confidence), 2),
+                'feature_importance': self.feature_importance,
+                'recommendations': recommendations,
+                'comparative_analysis': comparative_analysis,
+                'timestamp': datetime.now().isoformat()
+            })
+        
+        return results
     
     def _calculate_confidence(self, website_data: Dict) -> float:
         """Calculate prediction confidence based on data quality"""
+        return float(self._calculate_confidence_batch(pd.DataFrame([website_data]))[0])
+    
+    @staticmethod
+    def _key_mask(websites: List[Dict], columns: pd.Index) -> np.ndarray:
+        """Mark which of the frame's columns each input dict actually provided"""
+        return np.array([[col in website for col in columns] for website in websites], dtype=bool).reshape(
+            len(websites), len(columns)
+        )
+    
+    def _calculate_confidence_batch(self, websites: pd.DataFrame, key_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculate prediction confidence for every website in a frame
+        
+        key_mask marks the columns each website supplied itself; without it
+        every column counts, as for a frame read from a table.
+        """
         confidence_factors = {
             'monthly_visitors': 0.15,
             'domain_authority': 0.15,
@@ -441,146 +629,58 @@ class WebsiteValuationAI:
             'data_completeness': 0.1
         }
         
-        # Check data completeness
-        missing_data = sum(1 for v in website_data.values() if pd.isna(v))
-        data_completeness = 1 - (missing_data / len(website_data))
+        # Column whose presence backs each factor
+        factor_columns = {
+            'monthly_visitors': 'monthly_visitors',
+            'domain_authority': 'domain_authority',
+            'conversion_rate': 'conversion_rate',
+            'competition_score': 'competition_score',
+            'technical_performance': 'page_load_time',
+            'content_quality': 'content_freshness',
+            'user_engagement': 'email_subscribers'
+        }
+        
+        # Check data completeness over each website's own fields, so columns
+        # only other websites in the batch carry do not count as missing
+        if key_mask is None:
+            key_mask = np.ones(websites.shape, dtype=bool)
+        missing = (websites.isna().to_numpy() & key_mask).sum(axis=1)
+        data_completeness = 1 - missing / key_mask.sum(axis=1)
         
         # Calculate confidence score with weighted factors
-        confidence = (
-            confidence_factors['monthly_visitors'] * (website_data['monthly_visitors'] > 0) +
-            confidence_factors['domain_authority'] * (website_data['domain_authority'] > 0) +
-            confidence_factors['conversion_rate'] * (website_data['conversion_rate'] > 0) +
-            confidence_factors['competition_score'] * (website_data['competition_score'] > 0) +
-            confidence_factors['technical_performance'] * (website_data['page_load_time'] > 0) +
-            confidence_factors['content_quality'] * (website_data['content_freshness'] > 0) +
-            confidence_factors['user_engagement'] * (website_data['email_subscribers'] > 0) +
-            confidence_factors['data_completeness'] * data_completeness
-        ) * 100
-        
-        return confidence
+        confidence = confidence_factors['data_completeness'] * data_completeness
+        for factor, column in factor_columns.items():
+            present = websites[column].fillna(0).to_numpy(dtype=float) > 0
+            confidence = confidence + confidence_factors[factor] * present
+        
+        return confidence * 100
     
     def _generate_recommendations(self, website_data: Dict) -> List[Dict]:
         """Generate improvement recommendations"""
-        recommendations = []
-        
-        # Traffic recommendations
-        if website_data['monthly_visitors'] < 1000:
-            recommendations.append({
-                'category': 'traffic',
-                'priority': 'high',
-                'action': 'Implement comprehensive marketing strategy',
-                'expected_impact': '20-30% increase in monthly visitors',
-                'timeframe': '3-6 months',
-                'estimated_cost': '$5,000-$10,000',
-                'metrics_affected': ['monthly_visitors', 'page_views', 'conversion_rate'],
-                'roi_estimate': '200-300%',
-                'implementation_steps': [
-                    'Develop content marketing strategy',
-                    'Implement SEO best practices',
-                    'Launch paid advertising campaigns',
-                    'Optimize social media presence'
-                ]
-            })
-        
-        # SEO recommendations
-        if website_data['domain_authority'] < 30:
-            recommendations.append({
-                'category': 'seo',
-                'priority': 'medium',
-                'action': 'Develop backlink acquisition strategy',
-                'expected_impact': '5-10 point increase in domain authority',
-                'timeframe': '6-12 months',
-                'estimated_cost': '$3,000-$6,000',
-                'metrics_affected': ['domain_authority', 'backlinks', 'organic_keywords'],
-                'roi_estimate': '150-250%',
-                'implementation_steps': [
-                    'Conduct competitor backlink analysis',
-                    'Create high-quality content for link building',
-                    'Build relationships with industry influencers',
-                    'Implement technical SEO improvements'
-                ]
-            })
-        
-        # Technical recommendations
-        if website_data['page_load_time'] > 3:
-            recommendations.append({
-                'category': 'technical',
-                'priority': 'high',
-                'action': 'Optimize website performance',
-                'expected_impact': '50% reduction in page load time',
-                'timeframe': '1-2 months',
-                'estimated_cost': '$2,000-$4,000',
-                'metrics_affected': ['page_load_time', 'bounce_rate', 'conversion_rate'],
-                'roi_estimate': '300-400%',
-                'implementation_steps': [
-                    'Optimize image sizes and formats',
-                    'Implement browser caching',
-                    'Minify CSS and JavaScript',
-                    'Upgrade hosting infrastructure'
-                ]
-            })
-        
-        # Content recommendations
-        if website_data['content_freshness'] < 50:
-            recommendations.append({
-                'category': 'content',
-                'priority': 'medium',
-                'action': 'Update and expand content strategy',
-                'expected_impact': 'Improved user engagement and SEO',
-                'timeframe': '3-6 months',
-                'estimated_cost': '$4,000-$8,000',
-                'metrics_affected': ['content_freshness', 'avg_time_on_site', 'social_shares'],
-                'roi_estimate': '180-280%',
-                'implementation_steps': [
-                    'Audit existing content',
-                    'Develop content calendar',
-                    'Create pillar content pieces',
-                    'Implement content distribution strategy'
-                ]
-            })
-        
-        # User engagement recommendations
-        if website_data['email_subscribers'] < 1000:
-            recommendations.append({
-                'category': 'engagement',
-                'priority': 'medium',
-                'action': 'Implement email marketing strategy',
-                'expected_impact': '500-1000 new subscribers',
-                'timeframe': '3-6 months',
-                'estimated_cost': '$2,000-$5,000',
-                'metrics_affected': ['email_subscribers', 'conversion_rate', 'returning_visitors'],
-                'roi_estimate': '250-350%',
-                'implementation_steps': [
-                    'Create lead magnets',
-                    'Implement email automation',
-                    'Design email templates',
-                    'Develop segmentation strategy'
-                ]
-            })
-        
-        # Mobile optimization recommendations
-        if website_data['mobile_traffic'] < 30:
-            recommendations.append({
-                'category': 'mobile',
-                'priority': 'high',
-                'action': 'Optimize for mobile experience',
-                'expected_impact': '20-30% increase in mobile traffic',
-                'timeframe': '2-4 months',
-                'estimated_cost': '$3,000-$6,000',
-                'metrics_affected': ['mobile_traffic', 'bounce_rate', 'conversion_rate'],
-                'roi_estimate': '220-320%',
-                'implementation_steps': [
-                    'Implement responsive design',
-                    'Optimize mobile navigation',
-                    'Improve mobile page speed',
-                    'Enhance mobile forms and CTAs'
-                ]
-            })
+        return self._generate_recommendations_batch(pd.DataFrame([website_data]))[0]
+    
+    def _generate_recommendations_batch(self, websites: pd.DataFrame) -> List[List[Dict]]:
+        """Generate improvement recommendations for every website in a frame"""
+        # Evaluate each rule over whole columns, then collect per website
+        triggered = np.column_stack([
+            compare(websites[column].to_numpy(dtype=float), threshold)
+            for column, compare, threshold, _ in self._RECOMMENDATION_RULES
+        ])
         
-        return recommendations
+        return [
+            [
+                copy.deepcopy(rule[3])
+                for rule, fired in zip(self._RECOMMENDATION_RULES, row)
+                if fired
+            ]
+            for row in triggered
+        ]
     
     def visualize_results(self, result: Dict, save_path: Optional[str] = None) -> None:
         """Create comprehensive visualizations of the valuation results"""
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
         # Create interactive plotly figure
         fig = make_subplots(
             rows=3, cols=2,
@@ -805,6 +905,7 @@ class WebsiteValuationAI:
         joblib.dump({
             'model': self.model,
             'scaler': self.scaler,
+            'fill_values': self.fill_values,
             'feature_importance': self.feature_importance
         }, path)
     
@@ -814,10 +915,14 @@ class WebsiteValuationAI:
         saved_data = joblib.load(path)
         self.model = saved_data['model']
         self.scaler = saved_data['scaler']
+        self.fill_values = saved_data.get('fill_values', {})
         self.feature_importance = saved_data['feature_importance']
 
     def visualize_comparative_analysis(self, analysis: Dict, save_path: Optional[str] = None) -> None:
         """Create enhanced visualizations for comparative analysis"""
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
         if not analysis:
             return
         
@@ -1205,6 +1310,10 @@ class WebsiteValuationAI:
     
     def create_dashboard(self, metrics: Dict) -> None:
         """Create an enhanced interactive dashboard for key metrics"""
+        import dash
+        from dash import dcc, html
+        import dash_bootstrap_components as dbc
+        
         app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
         
         # Define alert colors based on metric values
@@ -1564,8 +1673,10 @@ class WebsiteValuationAI:
         
         self.dashboard = app
     
-    def _create_retention_trend_chart(self, metrics: Dict) -> go.Figure:
+    def _create_retention_trend_chart(self, metrics: Dict) -> "go.Figure":
         """Create retention trend visualization"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
         # Add retention rate trend
@@ -1593,8 +1704,10 @@ class WebsiteValuationAI:
         
         return fig
     
-    def _create_product_distribution_chart(self, metrics: Dict) -> go.Figure:
+    def _create_product_distribution_chart(self, metrics: Dict) -> "go.Figure":
         """Create product distribution visualization"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
         # Add product revenue distribution
@@ -1611,8 +1724,10 @@ class WebsiteValuationAI:
         
         return fig
     
-    def _create_financial_trend_chart(self, metrics: Dict) -> go.Figure:
+    def _create_financial_trend_chart(self, metrics: Dict) -> "go.Figure":
         """Create financial trends visualization"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
         # Add revenue trend
@@ -1640,8 +1755,10 @@ class WebsiteValuationAI:
         
         return fig
     
-    def _create_operational_metrics_chart(self, metrics: Dict) -> go.Figure:
+    def _create_operational_metrics_chart(self, metrics: Dict) -> "go.Figure":
         """Create operational metrics visualization"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
         # Add operational metrics